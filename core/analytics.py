@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from peewee import fn
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+def truncate_hour(date: datetime) -> datetime:
+    return date.replace(minute=0, second=0, microsecond=0)
+
+
+def truncate_day(date: datetime) -> datetime:
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# (rollup model, how a timestamp is truncated to its bucket)
+ROLLUPS = (
+    (database.CommandUsageHourly, truncate_hour),
+    (database.CommandUsageDaily, truncate_day),
+)
+
+
+def _as_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def apply_rollups(rows: Iterable[dict]):
+    """
+    Add CommandAnalytics rows to the hourly and daily rollups.
+
+    Must run inside the transaction that inserts the raw rows, so rollups and raw data never drift apart.
+    """
+    rows = list(rows)
+    for model, truncate in ROLLUPS:
+        counts = Counter(
+            (truncate(_as_datetime(row["date"])), row["command"], row["guild_id"], row["command_type"])
+            for row in rows
+        )
+        _upsert(model, counts)
+
+
+def _upsert(model, counts: Counter):
+    if not counts:
+        return
+    (
+        model.insert_many([
+            {"bucket": bucket, "command": command, "guild_id": guild_id, "command_type": command_type, "uses": uses}
+            for (bucket, command, guild_id, command_type), uses in counts.items()
+        ])
+        .on_conflict(
+            conflict_target=database.conflict_target(model.bucket, model.command, model.guild_id, model.command_type),
+            update={model.uses: model.uses + database.excluded(model.uses)},
+        )
+        .execute()
+    )
+
+
+def rebuild_rollups(chunk_size: int = 5000) -> int:
+    """
+    Recompute both rollups from the raw CommandAnalytics table.
+
+    Raw rows are streamed in chunks, so memory only grows with the number of distinct buckets.
+
+    Returns:
+        int: The number of raw rows that were rolled up.
+    """
+    CA = database.CommandAnalytics
+    totals = {model: Counter() for model, _ in ROLLUPS}
+    processed = 0
+    query = CA.select(CA.date, CA.command, CA.guild_id, CA.command_type).tuples().iterator()
+    for date, command, guild_id, command_type in query:
+        date = _as_datetime(date)
+        for model, truncate in ROLLUPS:
+            totals[model][(truncate(date), command, guild_id, command_type)] += 1
+        processed += 1
+
+    with database.db.atomic():
+        for model, counts in totals.items():
+            model.delete().execute()
+            items = list(counts.items())
+            for start in range(0, len(items), chunk_size):
+                _upsert(model, Counter(dict(items[start:start + chunk_size])))
+    return processed
+
+
+def _filtered(query, model, command_type: Optional[str], guild_id: Optional[int]):
+    if command_type:
+        query = query.where(model.command_type == command_type)
+    if guild_id:
+        query = query.where(model.guild_id == guild_id)
+    return query
+
+
+def _uses_by_command(model, start: datetime, end: Optional[datetime], command_type, guild_id) -> Counter:
+    uses = fn.SUM(model.uses)
+    query = model.select(model.command, uses).where(model.bucket >= start)
+    if end is not None:
+        query = query.where(model.bucket < end)
+    query = _filtered(query, model, command_type, guild_id).group_by(model.command)
+    return Counter(dict(query.tuples()))
+
+
+def top_commands(
+        since: datetime,
+        command_type: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        limit: int = 10,
+) -> List[Tuple[str, int]]:
+    """
+    Most used commands since ``since``, counted in whole hours (the hour ``since`` falls in is included).
+
+    Periods of up to two days are read from the hourly rollup. Longer ones take the hours up to the first midnight
+    from the hourly rollup and the full days after it from the daily one.
+    """
+    hourly, daily = database.CommandUsageHourly, database.CommandUsageDaily
+    start = truncate_hour(since)
+    if datetime.now() - since <= timedelta(days=2):
+        totals = _uses_by_command(hourly, start, None, command_type, guild_id)
+    else:
+        first_midnight = truncate_day(since)
+        if first_midnight < start:
+            first_midnight += timedelta(days=1)
+        totals = _uses_by_command(hourly, start, first_midnight, command_type, guild_id)
+        totals.update(_uses_by_command(daily, first_midnight, None, command_type, guild_id))
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def usage_series(
+        command: str,
+        since: datetime,
+        hourly: bool = False,
+        command_type: Optional[str] = None,
+        limit: Optional[int] = None,
+) -> List[Tuple[datetime, int]]:
+    """
+    Uses per bucket for one command, starting with the bucket ``since`` falls in.
+
+    Args:
+        command (str): The command name.
+        since (datetime): Start of the period.
+        hourly (bool): Per hour instead of per day.
+        command_type (str, optional): Only count slash or regular uses.
+        limit (int, optional): Only return the newest ``limit`` buckets.
+    """
+    if hourly:
+        model, truncate = database.CommandUsageHourly, truncate_hour
+    else:
+        model, truncate = database.CommandUsageDaily, truncate_day
+    uses = fn.SUM(model.uses)
+    query = model.select(model.bucket, uses).where((model.bucket >= truncate(since)) & (model.command == command))
+    query = _filtered(query, model, command_type, None).group_by(model.bucket).order_by(model.bucket.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return [(_as_datetime(bucket), total) for bucket, total in reversed(list(query.tuples()))]
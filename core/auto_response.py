@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, FrozenSet
+
+import discord
+
+from core import metrics, role_gates
+from core.phrase_matcher import EVENT_REQUEST_PHRASES, PhraseMatcher
+
+GENERAL_CHAT = 1143716666392457226
+OFFICER_ROLE = 1154522379654008882
+
+role_gates.register("auto_response_exempt", {role_gates.HICOM, OFFICER_ROLE}, allow_bypass=False)
+
+
+def _channel_ids(value: str) -> FrozenSet[int]:
+    return frozenset(int(part) for part in value.replace(" ", "").split(",") if part)
+
+
+class AutoResponder:
+    """
+    Decides if a message gets the "use the events channel" auto-response, cheapest stages first.
+
+    1. Channel allowlist and per-user cooldown: drops almost all traffic with a set lookup and a dict lookup.
+    2. Exempt roles: HICOM and officers, checked against the member's cached role IDs.
+    3. The phrase matcher.
+    4. Per-channel rate limit: at most ``channel_limit`` replies per ``channel_window`` seconds.
+
+    Every stage counts what it rejects in ``stats``; ``replied`` counts messages that passed all of them. ``stats``
+    is only updated under ``metrics.registry.lock``, which the metrics endpoint holds while reading it.
+
+    Attributes:
+        channel_ids (frozenset): Channels the auto-response runs in.
+        user_cooldown (float): Seconds a user is skipped after getting a reply.
+        channel_limit (int): Replies allowed per channel per window.
+        channel_window (float): Length of the rate limit window in seconds.
+    """
+
+    def __init__(
+            self,
+            channel_ids: FrozenSet[int],
+            matcher: PhraseMatcher,
+            user_cooldown: float = 300.0,
+            channel_limit: int = 3,
+            channel_window: float = 60.0,
+    ):
+        self.channel_ids = channel_ids
+        self.matcher = matcher
+        self.user_cooldown = user_cooldown
+        self.channel_limit = channel_limit
+        self.channel_window = channel_window
+
+        self._last_reply: Dict[int, float] = {}
+        self._channel_replies: Dict[int, Deque[float]] = {}
+        self.stats: Counter = Counter()
+
+    def should_reply(self, message: discord.Message) -> bool:
+        """Run ``message`` through the pipeline; a True result is recorded against the cooldown and rate limit."""
+        stage = self._decide(message)
+        # the metrics endpoint reads stats from its own thread, under the same lock
+        with metrics.registry.lock:
+            self.stats["seen"] += 1
+            self.stats[stage] += 1
+        return stage == "replied"
+
+    def _decide(self, message: discord.Message) -> str:
+        """The name of the stage that rejected ``message``, or "replied"."""
+        # stage 1
+        if message.author.bot:
+            return "bot"
+        if message.channel.id not in self.channel_ids:
+            return "channel_filtered"
+        now = time.monotonic()
+        last = self._last_reply.get(message.author.id)
+        if last is not None and now - last < self.user_cooldown:
+            return "cooldown_filtered"
+
+        # stage 2
+        if role_gates.passes("auto_response_exempt", message.author):
+            return "exempt"
+
+        # stage 3
+        if not self.matcher.matches(message.content):
+            return "no_match"
+
+        # stage 4
+        replies = self._channel_replies.setdefault(message.channel.id, deque())
+        while replies and now - replies[0] >= self.channel_window:
+            replies.popleft()
+        if len(replies) >= self.channel_limit:
+            return "rate_limited"
+
+        replies.append(now)
+        self._remember_reply(message.author.id, now)
+        return "replied"
+
+    def _remember_reply(self, user_id: int, now: float):
+        self._last_reply[user_id] = now
+        if len(self._last_reply) > 1000:
+            self._last_reply = {
+                uid: at for uid, at in self._last_reply.items() if now - at < self.user_cooldown
+            }
+
+
+auto_responder = AutoResponder(
+    channel_ids=_channel_ids(os.getenv("AUTO_RESPONSE_CHANNELS", str(GENERAL_CHAT))),
+    matcher=PhraseMatcher(EVENT_REQUEST_PHRASES, threshold=0.6),
+    user_cooldown=float(os.getenv("AUTO_RESPONSE_USER_COOLDOWN", "300")),
+    channel_limit=int(os.getenv("AUTO_RESPONSE_CHANNEL_LIMIT", "3")),
+    channel_window=float(os.getenv("AUTO_RESPONSE_CHANNEL_WINDOW", "60")),
+)
+
+metrics.Gauge(
+    "arasaka_auto_response_messages_total",
+    "Messages seen by the event-request auto-response, by the stage that decided them.",
+    ("stage",),
+    callback=lambda: dict(auto_responder.stats),
+    kind="counter",
+)
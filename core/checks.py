@@ -5,69 +5,184 @@ If you require a specific command to be protected, you can use the @is_botAdmin
 If you wish to use the @is_botAdmin check, DM Space.
 Otherwise, use the same format to make your own check.
 """
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Set
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from core import database
+from core.logging_module import get_log
+from core.repository import repo
 
+_log = get_log(__name__)
 
-def predicate_LV1(ctx) -> bool:
-    adminIDs = []
 
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 1
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
+class PermitCache:
+    """
+    In-memory copy of the Administrators table as a Discord ID -> tier map.
 
-    return ctx.author.id in adminIDs
+    Loaded once (at startup, or by the first check that needs it) and reloaded after `/permit add` and
+    `/permit remove`, so every permission check is a single dictionary lookup.
 
+    Methods:
+        tier(discord_id): The user's permit tier, 0 if they have none.
+        has_tier(discord_id, min_tier): If the user is at or above a tier.
+        ids_at_least(min_tier): Discord IDs at or above a tier.
+        refresh(): Reload from the database without blocking the loop.
+        invalidate(): Drop the cached map, the next check reloads it.
+    """
 
-is_botAdmin = commands.check(predicate_LV1)
+    def __init__(self):
+        self._tiers: Optional[Dict[int, int]] = None
 
+    @staticmethod
+    def _load() -> Dict[int, int]:
+        A = database.Administrators
+        return dict(A.select(A.discordID, A.TierLevel).tuples())
 
-def predicate_LV2(ctx) -> bool:
-    adminIDs = []
+    @property
+    def tiers(self) -> Dict[int, int]:
+        if self._tiers is None:
+            self._tiers = self._load()
+        return self._tiers
 
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 2
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
+    def tier(self, discord_id: int) -> int:
+        return self.tiers.get(discord_id, 0)
 
-    return ctx.author.id in adminIDs
+    def has_tier(self, discord_id: int, min_tier: int) -> bool:
+        return self.tiers.get(discord_id, 0) >= min_tier
 
+    def ids_at_least(self, min_tier: int) -> Set[int]:
+        return {discord_id for discord_id, tier in self.tiers.items() if tier >= min_tier}
 
-is_botAdmin2 = commands.check(predicate_LV2)
+    async def refresh(self):
+        self._tiers = await database.run_sync(self._load)
+        _log.info(f"Loaded {len(self._tiers)} bot administrator(s).")
 
+    def invalidate(self):
+        self._tiers = None
 
-def predicate_LV3(ctx):
-    adminIDs = []
 
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 3
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
+permits = PermitCache()
 
-    return ctx.author.id in adminIDs
 
+class BlacklistCache:
+    """
+    In-memory set of blacklisted Discord IDs, checked by the global interaction check.
 
-is_botAdmin3 = commands.check(predicate_LV3)
+    Loaded at startup; `add` and `remove` write through to the Blacklist table, so the gate itself never touches
+    the database. Every blocked interaction is counted per user and logged.
 
+    Methods:
+        is_blacklisted(discord_id): Membership test, counts and logs a hit.
+        add(discord_id): Blacklist a user.
+        remove(discord_id): Lift a blacklist, returns False if the user wasn't blacklisted.
+        refresh(): Reload from the database.
+    """
+
+    def __init__(self):
+        self._ids: Set[int] = set()
+        self.hits: Counter = Counter()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, discord_id: int) -> bool:
+        return discord_id in self._ids
+
+    def is_blacklisted(self, discord_id: int) -> bool:
+        if discord_id not in self._ids:
+            return False
+        self.hits[discord_id] += 1
+        _log.info(f"Blocked blacklisted user {discord_id} ({self.hits[discord_id]} hit(s) since startup).")
+        return True
+
+    async def refresh(self):
+        B = database.Blacklist
+        self._ids = await database.run_sync(lambda: {discord_id for discord_id, in B.select(B.discordID).tuples()})
+        _log.info(f"Loaded {len(self._ids)} blacklisted user(s).")
+
+    async def add(self, discord_id: int):
+        B = database.Blacklist
+        await database.run_sync(B.insert(discordID=discord_id).on_conflict_ignore().execute)
+        self._ids.add(discord_id)
+
+    async def remove(self, discord_id: int) -> bool:
+        B = database.Blacklist
+        removed = await database.run_sync(B.delete().where(B.discordID == discord_id).execute)
+        self._ids.discard(discord_id)
+        self.hits.pop(discord_id, None)
+        return removed > 0
 
-def predicate_LV4(ctx):
-    adminIDs = []
 
-    query = database.Administrators.select().where(
-        database.Administrators.TierLevel >= 4
-    )
-    for admin in query:
-        adminIDs.append(admin.discordID)
+blacklist = BlacklistCache()
 
-    return ctx.author.id in adminIDs
+
+class MaintenanceCache:
+    """
+    In-memory copy of the MaintenanceMode row.
+
+    Loaded at startup and written through by `/maintenance`, so the interaction check reads it without touching the
+    database, while the table keeps the state across restarts. Owners (permit 4) are looked up in `permits`.
+
+    Attributes:
+        enabled (bool): If maintenance mode is on.
+        reason (str): Why it was turned on or off.
+        start_time (datetime): When it was last toggled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reason: Optional[str] = None
+        self.start_time: Optional[datetime] = None
+
+    def _apply(self, row: database.MaintenanceMode):
+        self.enabled = bool(row.enabled)
+        self.reason = row.reason
+        start_time = row.start_time
+        self.start_time = datetime.fromisoformat(start_time) if isinstance(start_time, str) else start_time
+
+    def blocks(self, discord_id: int) -> bool:
+        """If maintenance mode keeps this user from using commands."""
+        return self.enabled and not permits.has_tier(discord_id, 4)
+
+    async def refresh(self):
+        self._apply(await repo.maintenance_state())
+
+    async def toggle(self, reason: str) -> "MaintenanceCache":
+        self._apply(await repo.toggle_maintenance(reason))
+        return self
+
+
+maintenance = MaintenanceCache()
+
+
+def predicate_LV1(ctx) -> bool:
+    return permits.has_tier(ctx.author.id, 1)
+
+
+is_botAdmin = commands.check(predicate_LV1)
+
+
+def predicate_LV2(ctx) -> bool:
+    return permits.has_tier(ctx.author.id, 2)
+
+
+is_botAdmin2 = commands.check(predicate_LV2)
+
+
+def predicate_LV3(ctx):
+    return permits.has_tier(ctx.author.id, 3)
+
+
+is_botAdmin3 = commands.check(predicate_LV3)
+
+
+def predicate_LV4(ctx):
+    return permits.has_tier(ctx.author.id, 4)
 
 
 is_botAdmin4 = commands.check(predicate_LV4)
@@ -75,59 +190,27 @@ is_botAdmin4 = commands.check(predicate_LV4)
 
 def slash_is_bot_admin():
     def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 1
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
+        return permits.has_tier(interaction.user.id, 1)
 
     return app_commands.check(predicate)
 
 
 def slash_is_bot_admin_2():
     def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 2
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
+        return permits.has_tier(interaction.user.id, 2)
 
     return app_commands.check(predicate)
 
 
 def slash_is_bot_admin_3():
     def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 3
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
+        return permits.has_tier(interaction.user.id, 3)
 
     return app_commands.check(predicate)
 
 
 def slash_is_bot_admin_4():
     def predicate(interaction: discord.Interaction) -> bool:
-        admin_ids = []
-
-        query = database.Administrators.select().where(
-            database.Administrators.TierLevel >= 4
-        )
-        for admin in query:
-            admin_ids.append(admin.discordID)
-
-        return interaction.user.id in admin_ids
+        return permits.has_tier(interaction.user.id, 4)
 
     return app_commands.check(predicate)
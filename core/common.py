@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 import subprocess
 import sys
-from datetime import datetime
 from difflib import get_close_matches
 from pathlib import Path
 from threading import Thread
+import httpx
 import roblox
 from typing import (
     Any,
@@ -20,7 +21,6 @@ from typing import (
 
 import discord
 import gspread
-import pytz
 import requests
 from discord import ui, Button, ButtonStyle
 from discord.ext import commands
@@ -30,8 +30,11 @@ from oauth2client.service_account import ServiceAccountCredentials
 from openai import OpenAI
 from roblox import Client
 
-from core import database
+from core import metrics
 from core.logging_module import get_log
+from core.member_index import display_names
+from core.repository import repo
+from core.roster import roster
 
 if TYPE_CHECKING:
     pass
@@ -68,12 +71,81 @@ class OpenAIClient:
         self.client = OpenAI(api_key=key)
 
 
+class StandInTransport(httpx.AsyncHTTPTransport):
+    """
+    Rewrites ``https://<subdomain>.roblox.com/<path>`` to ``<base_url>/<subdomain>/<path>``.
+
+    Used when ``ROBLOX_API_BASE_URL`` points the bot at the local stand-in server (``tools/stand_in_server.py``).
+    """
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = httpx.URL(base_url.rstrip("/"))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        subdomain = request.url.host.split(".", 1)[0]
+        request.url = self.base_url.copy_with(
+            path=f"{self.base_url.path.rstrip('/')}/{subdomain}{request.url.path}",
+            query=request.url.query or None,
+        )
+        request.headers["Host"] = self.base_url.netloc.decode("ascii")
+        return await super().handle_async_request(request)
+
+
 class RobloxClient:
+    """
+    Process-wide Roblox client.
+
+    Every caller shares one ``roblox.Client`` so all Roblox API traffic goes through a single pooled HTTP
+    session with bounded connections and timeouts. Use ``RobloxClient.shared()`` to get it and
+    ``RobloxClient.close_shared()`` when the bot shuts down.
+    """
+
+    _shared: RobloxClient | None = None
+
     def __init__(self, api_key: str | None = None):
         key = api_key or os.getenv("ROBLOX_SECURITY")
         if not key:
             raise RuntimeError("Roblox API environment variable not set")
-        self.client = roblox.Client(key)
+        self.client = roblox.Client()
+
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("ROBLOX_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("ROBLOX_HTTP_MAX_KEEPALIVE", "10")),
+        )
+        base_url = os.getenv("ROBLOX_API_BASE_URL")
+        if base_url:
+            transport = StandInTransport(base_url, limits=limits)
+            _log.warning(f"Roblox API requests are being routed to {base_url}")
+        else:
+            transport = httpx.AsyncHTTPTransport(limits=limits)
+        transport = metrics.MeteredTransport(transport, "roblox")
+
+        # swap ro.py's default session for a pooled one, keeping the headers it sets up
+        requests_session = self.client.requests.session
+        self.client.requests.session = httpx.AsyncClient(
+            headers=requests_session.headers,
+            transport=transport,
+            timeout=httpx.Timeout(float(os.getenv("ROBLOX_HTTP_TIMEOUT", "10")), connect=5.0),
+        )
+        self.client.set_token(key)
+
+    @classmethod
+    def shared(cls) -> RobloxClient:
+        """Return the process-wide instance, creating it on first use."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    async def close_shared(cls):
+        """Close the process-wide instance if one was created."""
+        if cls._shared is not None:
+            await cls._shared.close()
+            cls._shared = None
+
+    async def close(self):
+        await self.client.requests.session.aclose()
 
 
 class LoggingChannels:
@@ -395,20 +467,35 @@ class RobloxDiscordLinker:
         bot (discord.Client): The Discord bot instance.
         guild_id (int): The ID of the Discord guild.
         sheet (gspread.Worksheet, optional): The Google Sheet containing user data.
-        client (roblox.Client, optional): The Roblox client for API interactions.
+        client (roblox.Client, optional): The Roblox client for API interactions. Defaults to the shared client.
+        bloxlink_base_url (str, optional): Base URL of the Blox.link API. Defaults to ``BLOXLINK_API_BASE_URL``
+            or the public API.
 
     Methods:
         discord_id_to_roblox_username(discord_id): Convert a Discord ID to a Roblox username.
+        discord_id_to_roblox_id(discord_id): Convert a Discord ID to a Roblox ID.
         discord_id_to_roblox_user(discord_id, group): Convert a Discord ID to a Roblox user in a group.
         roblox_username_to_discord_id(roblox_username): Convert a Roblox username to a Discord ID.
         get_user_xp_data(username): Get a user's XP data from the Google Sheet.
     """
 
-    def __init__(self, bot: discord.Client, guild_id: int, sheet=None):
+    def __init__(
+            self,
+            bot: discord.Client,
+            guild_id: int,
+            sheet=None,
+            client: Client = None,
+            bloxlink_base_url: str = None,
+    ):
         self.bot = bot
         self.guild_id = guild_id
         self.sheet = sheet
-        self.client = Client(os.getenv("ROBLOX_SECURITY")) if os.getenv("ROBLOX_SECURITY") else None
+        if client is None and os.getenv("ROBLOX_SECURITY"):
+            client = RobloxClient.shared().client
+        self.client = client
+        self.bloxlink_base_url = (
+            bloxlink_base_url or os.getenv("BLOXLINK_API_BASE_URL", "https://api.blox.link")
+        ).rstrip("/")
 
     async def discord_id_to_roblox_username(self, discord_id: int) -> Union[str, None]:
         """
@@ -420,18 +507,52 @@ class RobloxDiscordLinker:
         Returns:
             str or None: The Roblox username if found, None otherwise.
         """
-        response = requests.get(
-            f'https://api.blox.link/v4/public/guilds/{LoggingChannels.guild}/discord-to-roblox/{discord_id}',
-            headers={"Authorization": os.getenv("BLOXLINK_TOKEN")})
+        roblox_id = await self.discord_id_to_roblox_id(discord_id)
+        if roblox_id is None:
+            return None
+
+        # Members of the group are already in the roster index, no need to ask Roblox
+        roblox_name = roster.username_for_id(roblox_id)
+        if roblox_name:
+            return roblox_name
+
+        roblox_user = await self.client.get_user(roblox_id)
+        return roblox_user.name if roblox_user else None
+
+    async def discord_id_to_roblox_id(self, discord_id: int) -> Union[int, None]:
+        """
+        Convert a Discord ID to a Roblox ID using the Blox.link API.
+
+        Links resolved in the last few minutes are answered from the roster index (see `GroupRoster.link_ttl`); the
+        Blox.link request runs in a worker thread so it doesn't block the event loop.
+
+        Args:
+            discord_id (int): The Discord ID to convert.
+
+        Returns:
+            int or None: The Roblox ID if found, None otherwise.
+        """
+        roblox_id = roster.roblox_id_for_discord(discord_id)
+        if roblox_id is not None:
+            return roblox_id
+
+        with metrics.external_call("bloxlink") as call:
+            response = await asyncio.to_thread(
+                requests.get,
+                f'{self.bloxlink_base_url}/v4/public/guilds/{LoggingChannels.guild}/discord-to-roblox/{discord_id}',
+                headers={"Authorization": os.getenv("BLOXLINK_TOKEN")},
+                timeout=10,
+            )
+            call.status = response.status_code
 
         if response.status_code == 200:
-            roblox_id = response.json()['robloxID']
-            roblox_user = await self.client.get_user(roblox_id)
-            return roblox_user.name if roblox_user else None
+            roblox_id = int(response.json()['robloxID'])
+            roster.link_discord(discord_id, roblox_id)
+            return roblox_id
         else:
             return None
 
-    def discord_id_to_roblox_user(self, discord_id: int, group):
+    async def discord_id_to_roblox_user(self, discord_id: int, group):
         """
         Convert a Discord ID to a Roblox user in a group using the Blox.link API.
 
@@ -442,12 +563,9 @@ class RobloxDiscordLinker:
         Returns:
             roblox.Member or None: The Roblox group member if found, None otherwise.
         """
-        response = requests.get(
-            f'https://api.blox.link/v4/public/guilds/{LoggingChannels.guild}/discord-to-roblox/{discord_id}',
-            headers={"Authorization": os.getenv("BLOXLINK_TOKEN")})
-
-        if response.status_code == 200:
-            return group.get_member(response.json()['robloxID'])
+        roblox_id = await self.discord_id_to_roblox_id(discord_id)
+        if roblox_id is not None:
+            return group.get_member(roblox_id)
         else:
             return None
 
@@ -456,9 +574,11 @@ class RobloxDiscordLinker:
         Convert a Roblox username to a Discord ID.
 
         This method tries several approaches:
-        1. Look for a Discord member with a matching display name
+        1. Look for the one Discord member with a matching display name (case-insensitive)
         2. Search in the Google Sheet for the username and extract the Discord ID
 
+        A display name shared by several members is treated as not found, so the sheet decides.
+
         Args:
             roblox_username (str): The Roblox username to convert.
 
@@ -466,9 +586,14 @@ class RobloxDiscordLinker:
             int or str: The Discord ID if found, or the original Roblox username if not found.
         """
         # Try to find a Discord member with a matching display name
-        member = discord.utils.get(self.bot.get_guild(self.guild_id).members, display_name=roblox_username)
-        if member:
-            return member.id
+        if display_names.is_indexed(self.guild_id):
+            member_id = display_names.resolve(self.guild_id, roblox_username)
+            if member_id is not None:
+                return member_id
+        else:
+            member = discord.utils.get(self.bot.get_guild(self.guild_id).members, display_name=roblox_username)
+            if member:
+                return member.id
 
         # Try to find the username in the Google Sheet
         if self.sheet:
@@ -702,6 +827,7 @@ async def process_xp_updates(interaction, sheet, usernames, reason, get_attendee
     parsed_usernames = []
     username_to_disc_parsed = []
     all_usernames = sheet.col_values(2)[1:]
+    linker = RobloxDiscordLinker(interaction.client, interaction.guild.id, sheet)
 
     for username in usernames:
         if "N/A" in username:
@@ -859,13 +985,11 @@ async def process_xp_updates(interaction, sheet, usernames, reason, get_attendee
         sheet.update(values, f'H{user_row}:I{user_row}')
 
         # Use the RobloxDiscordLinker class to get the Discord ID
-        linker = RobloxDiscordLinker(interaction.client, interaction.guild.id, sheet)
         disc_id = linker.roblox_username_to_discord_id(username)
 
         if get_attendees:
             username_to_disc_parsed.append(disc_id)
-        q: database.EventLoggingRecords = database.EventLoggingRecords.create(
-            datetime_object=datetime.now(tz=pytz.timezone("America/New_York")),
+        await repo.record_event(
             host_username=interaction.user.display_name,
             host_id=interaction.user.id,
             event_type=reason,
@@ -873,7 +997,6 @@ async def process_xp_updates(interaction, sheet, usernames, reason, get_attendee
             attendee_id=disc_id if isinstance(disc_id, int) else 0,
             xp_awarded=weekly_xp if format == 2 else xp,
         )
-        q.save()
 
         if format == 1:
             if xp >= 0:
@@ -1002,7 +1125,7 @@ class RankHierarchy:
       group_id (int): The group ID associated with the rank hierarchy.
       sheet (gspread.Worksheet): The worksheet object from the gspread library.
       officer_rank (str): The rank of the officer who is performing rank-related operations.
-      client (Client): The Bloxlink client for fetching Roblox usernames.
+      client (Client): The shared Roblox client used for API interactions.
       ranks (list): A list of rank names in descending order of hierarchy.
 
     Methods:
@@ -1016,11 +1139,11 @@ class RankHierarchy:
         return_raw_group_rank(formatted_rank): Return the raw rank name based on the formatted rank name.
     """
 
-    def __init__(self, group_id: int, sheet, officer_rank: str = None):
+    def __init__(self, group_id: int, sheet, officer_rank: str = None, client: Client = None):
         self.group_id = group_id
         self.sheet = sheet
         self.officer_rank = officer_rank
-        self.client = Client(os.getenv("ROBLOX_SECURITY"))
+        self.client = client or RobloxClient.shared().client
         self.ranks = [
             "Big Boss of Arasaka"
             "Clan Leader",  # Highest
@@ -1045,7 +1168,14 @@ class RankHierarchy:
 
     async def set_officer_rank(self, officer: discord.Member):
         # Use the RobloxDiscordLinker class
-        linker = RobloxDiscordLinker(officer.guild._client, officer.guild.id, self.sheet)
+        linker = RobloxDiscordLinker(officer.guild._client, officer.guild.id, self.sheet, self.client)
+
+        # Answer from the roster index when the officer is a known group member
+        roblox_id = await linker.discord_id_to_roblox_id(officer.id)
+        if roblox_id is not None and roster.rank_for_id(roblox_id):
+            self.officer_rank = roster.rank_for_id(roblox_id)
+            return roster.username_for_id(roblox_id)
+
         roblox_username = await linker.discord_id_to_roblox_username(officer.id)
 
         if roblox_username:
@@ -1058,14 +1188,18 @@ class RankHierarchy:
         else:
             raise ValueError("Could not find Roblox username for this Discord user.")
 
-    def discord_to_roblox(self, discord_id, group):
+    async def discord_to_roblox(self, discord_id, group):
         # Use the RobloxDiscordLinker class
-        linker = RobloxDiscordLinker(None, LoggingChannels.guild, None)
-        return linker.discord_id_to_roblox_user(discord_id, group)
+        linker = RobloxDiscordLinker(None, LoggingChannels.guild, None, self.client)
+        return await linker.discord_id_to_roblox_user(discord_id, group)
 
     async def get_rank(self, roblox_username):
-        # Use the RobloxDiscordLinker class
-        linker = RobloxDiscordLinker(None, LoggingChannels.guild, self.sheet)
+        rank = roster.rank_for_username(roblox_username)
+        if rank:
+            return rank
+
+        # Not in the roster index (yet), fall back to the sheet
+        linker = RobloxDiscordLinker(None, LoggingChannels.guild, self.sheet, self.client)
         user_data = await linker.get_user_xp_data(roblox_username)
         if user_data:
             return user_data['rank']
@@ -1,56 +1,170 @@
+import asyncio
+import functools
+import operator
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
 import pytz
 from dotenv import load_dotenv
 from peewee import (
+    EXCLUDED,
     AutoField,
     BigIntegerField,
     BooleanField,
+    CharField,
+    Database,
     DateTimeField,
     IntegerField,
     Model,
+    MySQLDatabase,
+    Select,
+    SQL,
     SqliteDatabase,
     TextField,
-    FloatField
+    FloatField,
+    ForeignKeyField,
+    fn,
 )
+from playhouse.pool import PooledDatabase, PooledMySQLDatabase, PooledPostgresqlDatabase
 
 from core.logging_module import get_log
 
 load_dotenv()
 _log = get_log(__name__)
 """
-Change to a SqliteDatabase if you don't have any MySQL Credentials.
-If you do switch, comment/remove the MySQLDatabase variable and uncomment/remove the # from the SqliteDatabase instance. 
+DATABASE BACKEND
+
+`DATABASE_BACKEND` picks the database: `sqlite` (default, `data.db`), or a pooled `postgres`/`mysql` server reached
+through `DATABASE_IP`, `DATABASE_PORT`, `DATABASE_NAME`, `DATABASE_USER` and `DATABASE_PASSWORD`.
+`DATABASE_POOL_SIZE` caps the open connections, `DATABASE_POOL_TIMEOUT` is how long (seconds) a query waits for a
+free one, and `DATABASE_STALE_TIMEOUT` recycles connections idle for longer than that.
+
+Code that only makes sense on SQLite (pragmas, VACUUM) checks `IS_SQLITE`; upserts go through `conflict_target()`
+and `excluded()` so they work on every backend. String columns that are indexed or unique are `CharField`s, MySQL
+can't index a TEXT column without a key length.
 """
 
-if os.getenv("DATABASE_IP") is None:
-    db = SqliteDatabase("data.db")
-    _log.info("No Database IP found in .env file, using SQLite!")
+# WAL lets readers run alongside the single writer, NORMAL sync is durable in WAL mode,
+# and a negative cache_size is in KiB (64 MB here). Incremental auto_vacuum only takes effect on new databases,
+# existing ones are converted once at startup (retention.enable_incremental_vacuum).
+SQLITE_PRAGMAS = {
+    "auto_vacuum": "incremental",
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "64000")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+BACKEND = os.getenv("DATABASE_BACKEND", "sqlite").lower()
+POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "10"))
+STALE_TIMEOUT = int(os.getenv("DATABASE_STALE_TIMEOUT", "300"))
+
+
+def _server_settings(default_port: int) -> dict:
+    return {
+        "host": os.getenv("DATABASE_IP", "localhost"),
+        "port": int(os.getenv("DATABASE_PORT", str(default_port))),
+        "user": os.getenv("DATABASE_USER"),
+        "password": os.getenv("DATABASE_PASSWORD"),
+        "max_connections": POOL_SIZE,
+        "stale_timeout": STALE_TIMEOUT,
+        "timeout": POOL_TIMEOUT,
+    }
+
+
+def create_database() -> Database:
+    """Build the database selected by `DATABASE_BACKEND`."""
+    if BACKEND in ("postgres", "postgresql"):
+        database = PooledPostgresqlDatabase(os.getenv("DATABASE_NAME", "arasaka"), **_server_settings(5432))
+    elif BACKEND == "mysql":
+        database = PooledMySQLDatabase(
+            os.getenv("DATABASE_NAME", "arasaka"), charset="utf8mb4", **_server_settings(3306)
+        )
+    elif BACKEND == "sqlite":
+        return SqliteDatabase("data.db", pragmas=SQLITE_PRAGMAS)
+    else:
+        raise ValueError(f"Unknown DATABASE_BACKEND {BACKEND!r}, expected sqlite, postgres or mysql.")
+
+    _log.info(
+        f"Using {BACKEND} at {os.getenv('DATABASE_IP', 'localhost')} "
+        f"(pool of {POOL_SIZE}, {POOL_TIMEOUT:g}s wait)."
+    )
+    return database
+
 
-elif os.getenv("DATABASE_IP") is not None:
-    # useDB = bool(input(f"{bcolors.WARNING}Do you want to use MySQL? (y/n)\n    > This option should be avoided if you are testing new database structures, do not use MySQL Production if you are testing table modifications.{bcolors.ENDC}"))
-    db = SqliteDatabase("data.db")
+db = create_database()
+IS_SQLITE = isinstance(db, SqliteDatabase)
+if IS_SQLITE:
     if not os.getenv("PyTestMODE"):
-        _log.info(f"Successfully connected to the SQLite Database")
+        _log.info("Using the SQLite database (data.db).")
     else:
-        _log.info(f"Testing environment detected, using SQLite Database")
+        _log.info("Testing environment detected, using SQLite Database")
 
 
-def iter_table(model_dict: dict):
-    """Iterates through a dictionary of tables, confirming they exist and creating them if necessary."""
-    for key in model_dict:
-        if not db.table_exists(key):
-            db.connect(reuse_if_open=True)
-            db.create_tables([model_dict[key]])
-            db.close()
-        else:
-            db.connect(reuse_if_open=True)
-            for column in model_dict[key]._meta.sorted_fields:
-                if not db.column_exists(key, column.name):
-                    db.create_column(key, column.name)
-            db.close()
+def conflict_target(*fields):
+    """Upsert conflict target, MySQL resolves conflicts on any unique key and rejects an explicit one."""
+    return [] if isinstance(db, MySQLDatabase) else list(fields)
+
+
+def excluded(field):
+    """The value an upsert tried to insert into ``field``, for use in its ``update``."""
+    if isinstance(db, MySQLDatabase):
+        return fn.VALUES(field)
+    return getattr(EXCLUDED, field.column_name)
+
+
+"""
+DATABASE EXECUTOR
+
+Peewee calls block, so coroutines hand them to a dedicated executor with `await run_sync(func, *args)` instead of
+running them on the gateway loop. On SQLite the single worker opens its connection on first use and keeps it (and
+its page cache) until `close()`. On a server backend every call checks a connection out of the pool and returns it
+when done, so idle workers hold none.
+"""
+
+# SQLite has a single writer, so one worker. A server database gets a couple fewer workers than the pool holds,
+# leaving connections for the startup code, retention and exports, which run outside the executor.
+DB_WORKERS = int(os.getenv("DB_WORKERS", "1" if IS_SQLITE else str(max(1, POOL_SIZE - 2))))
+
+_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="database")
+
+
+def _call(func):
+    if IS_SQLITE:
+        db.connect(reuse_if_open=True)
+        return func()
+    with db.connection_context():
+        return func()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run a blocking database callable on the database executor and return its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _call, functools.partial(func, *args, **kwargs))
+
+
+def close():
+    """Close every worker's connection and stop the executor. Called when the bot shuts down."""
+    barrier = threading.Barrier(DB_WORKERS)
+
+    def _close_thread_connection():
+        db.close()
+        # hold this worker until every other worker has picked up its own close
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+
+    wait([_executor.submit(_close_thread_connection) for _ in range(DB_WORKERS)])
+    _executor.shutdown(wait=True)
+    if not db.is_closed():
+        db.close()
+    if isinstance(db, PooledDatabase):
+        db.close_all()
 
 
 """
@@ -118,7 +232,7 @@ class AdminLogging(BaseModel):
     discordID = BigIntegerField()
     action = TextField()
     content = TextField(default="N/A")
-    datetime = DateTimeField(default=datetime.now())
+    datetime = DateTimeField(default=datetime.now(), index=True)
 
 
 class Blacklist(BaseModel):
@@ -156,7 +270,7 @@ class CommandAnalytics(BaseModel):
 
     id = AutoField()
     command = TextField()
-    date = DateTimeField()
+    date = DateTimeField(index=True)
     command_type = TextField()
     guild_id = BigIntegerField()
     user = BigIntegerField()
@@ -201,6 +315,60 @@ class CheckInformation(BaseModel):
 # Discord to Roblox linking is now handled by Blox.link API
 
 
+class MemberIdentity(BaseModel):
+    """
+    # MemberIdentity
+    One row per member, the canonical key event records point at. (See `core/identity.py`)
+
+    `id`: AutoField()
+    Canonical member ID.
+
+    `discord_id`: BigIntegerField()
+    The member's Discord ID, if known.
+
+    `roblox_id`: BigIntegerField()
+    The member's Roblox user ID, if known.
+
+    `roblox_username`: TextField()
+    The member's Roblox username, if known.
+    """
+
+    id = AutoField()
+    discord_id = BigIntegerField(null=True, unique=True)
+    roblox_id = BigIntegerField(null=True, unique=True)
+    roblox_username = TextField(null=True)
+
+    @classmethod
+    def ids_for(cls, names, discord_id: int = None):
+        """Canonical IDs of the members known by any of `names` or by `discord_id`."""
+        keys = list({name.strip().lower() for name in names if name})
+        query = MemberAlias.select(MemberAlias.member).where(MemberAlias.name.in_(keys)).tuples()
+        members = {member for member, in query}
+        if discord_id:
+            members.update(member for member, in cls.select(cls.id).where(cls.discord_id == discord_id).tuples())
+        return list(members)
+
+
+class MemberAlias(BaseModel):
+    """
+    # MemberAlias
+    Every name a member has been logged under, lowercased, mapped to their MemberIdentity.
+
+    `id`: AutoField()
+    Database Entry ID
+
+    `name`: CharField()
+    The normalized name.
+
+    `member`: ForeignKeyField()
+    The member the name belongs to.
+    """
+
+    id = AutoField()
+    name = CharField(max_length=255, unique=True)
+    member = ForeignKeyField(MemberIdentity, backref="aliases", on_delete="CASCADE")
+
+
 class EventLoggingRecords(BaseModel):
     """
     # EventLoggingRecords
@@ -223,15 +391,107 @@ class EventLoggingRecords(BaseModel):
 
     `datetime`: DateTimeField()
     The date and time the event was hosted.
+
+    `host_member`/`attendee_member`: ForeignKeyField()
+    The canonical MemberIdentity of the host and attendee.
+
+    The member columns are indexed together with `datetime_object`, see `recent_for`.
     """
     id = AutoField()
-    host_username = TextField()
+    host_username = CharField(max_length=255)
     host_id = BigIntegerField()
-    attendee_username = TextField()
+    attendee_username = CharField(max_length=255)
     attendee_id = BigIntegerField(default=0)
     event_type = TextField()
     xp_awarded = FloatField()
     datetime_object = DateTimeField(default=datetime.now(tz=pytz.timezone("America/New_York")), null=False)
+    host_member = ForeignKeyField(MemberIdentity, null=True, index=False)
+    attendee_member = ForeignKeyField(MemberIdentity, null=True, index=False)
+
+    class Meta:
+        indexes = (
+            (("host_member", "datetime_object"), False),
+            (("attendee_member", "datetime_object"), False),
+        )
+
+    @classmethod
+    def recent_for(cls, names, discord_id: int = None, limit: int = 3):
+        """
+        Return the latest events a member hosted or attended, and how many there are in total.
+
+        The names and Discord ID are resolved to canonical member IDs first, then the host and attendee member
+        columns are each looked up on their own index and the matching IDs are combined with UNION,
+        so the top rows and the total come back in one query without scanning the table.
+
+        Returns:
+            tuple[list[EventLoggingRecords], int]: The latest `limit` events and the total count.
+        """
+        members = MemberIdentity.ids_for(names, discord_id)
+        if not members:
+            return [], 0
+        lookups = [
+            cls.select(cls.id).where(cls.host_member.in_(members)),
+            cls.select(cls.id).where(cls.attendee_member.in_(members)),
+        ]
+        matched = functools.reduce(operator.or_, lookups).cte("matched", columns=("id",))
+        total = Select(from_list=[matched], columns=[fn.COUNT(SQL("*"))])
+
+        query = (
+            cls.select(cls, total.alias("total_count"))
+            .join(matched, on=(cls.id == matched.c.id))
+            .order_by(cls.datetime_object.desc(), cls.id.desc())
+            .limit(limit)
+            .with_cte(matched)
+        )
+        events = list(query)
+        return events, (events[0].total_count if events else 0)
+
+    @classmethod
+    def history_page(cls, names, discord_id: int = None, cursor=None, older: bool = True, limit: int = 10):
+        """
+        Return one page of a member's events, newest first, using keyset pagination on (`datetime_object`, `id`).
+
+        `cursor` is the (`datetime_object`, `id`) of the last row of the current page when paging `older`, or of
+        the first row when paging newer; without it the newest page is returned. Both member lookups are bounded
+        range scans on their (member, `datetime_object`) index, so a page costs the same however far back it is.
+
+        Returns:
+            list[EventLoggingRecords]: Up to `limit` events, newest first.
+        """
+        members = MemberIdentity.ids_for(names, discord_id)
+        if not members:
+            return []
+        conditions = [cls.host_member.in_(members), cls.attendee_member.in_(members)]
+
+        if older:
+            order = (cls.datetime_object.desc(), cls.id.desc())
+        else:
+            order = (cls.datetime_object.asc(), cls.id.asc())
+        if cursor is not None:
+            when, row_id = cursor
+            if older:
+                after_cursor = (cls.datetime_object <= when) & ((cls.datetime_object < when) | (cls.id < row_id))
+            else:
+                after_cursor = (cls.datetime_object >= when) & ((cls.datetime_object > when) | (cls.id > row_id))
+            conditions = [condition & after_cursor for condition in conditions]
+
+        # each branch keeps its own LIMIT, wrapped in a subquery since SQLite won't take one on a compound member
+        branches = [
+            Select(
+                from_list=[cls.select(cls.id).where(condition).order_by(*order).limit(limit).alias(f"b{index}")],
+                columns=[SQL("id")],
+            )
+            for index, condition in enumerate(conditions)
+        ]
+        matched = functools.reduce(operator.or_, branches).cte("matched", columns=("id",))
+        page = list(
+            cls.select()
+            .join(matched, on=(cls.id == matched.c.id))
+            .order_by(*order)
+            .limit(limit)
+            .with_cte(matched)
+        )
+        return page if older else page[::-1]
 
 
 class EventQuota(BaseModel):
@@ -258,6 +518,39 @@ class EventQuota(BaseModel):
     datetime_object = DateTimeField(default=datetime.now(tz=pytz.timezone("America/New_York")), null=False)
 
 
+class EventQuotaCount(BaseModel):
+    """
+    # EventQuotaCount
+    Events per host, quota week and event type, kept current with every EventQuota insert. (For the quota embed)
+
+    `id`: AutoField()
+    Database Entry ID
+
+    `host_id`: BigIntegerField()
+    The user ID of the host.
+
+    `week`: DateTimeField()
+    Start of the quota week.
+
+    `event_type`: CharField()
+    The type of event hosted.
+
+    `events`: IntegerField()
+    How many events of this type the host ran that week.
+    """
+
+    id = AutoField()
+    host_id = BigIntegerField()
+    week = DateTimeField()
+    event_type = CharField(max_length=255)
+    events = IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            (("week", "host_id", "event_type"), True),
+        )
+
+
 class MaintenanceMode(BaseModel):
     """
     # Maintenance
@@ -282,21 +575,102 @@ class MaintenanceMode(BaseModel):
     reason = TextField(null=True)
 
 
+class CommandUsageHourly(BaseModel):
+    """
+    # CommandUsageHourly
+    Per-hour rollup of CommandAnalytics, kept current by the telemetry writer. (For /analytics)
+
+    `id`: AutoField()
+    Database Entry ID
+
+    `bucket`: DateTimeField()
+    Start of the hour.
+
+    `command`: CharField()
+    The command that was used.
+
+    `guild_id`: BigIntegerField()
+    The guild ID of the guild that the command was used in.
+
+    `command_type`: CharField()
+    The type of command that was used.
+
+    `uses`: IntegerField()
+    How many times the command was used in the hour.
+    """
+
+    id = AutoField()
+    bucket = DateTimeField()
+    command = CharField(max_length=100)
+    guild_id = BigIntegerField()
+    command_type = CharField(max_length=32)
+    uses = IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            (("bucket", "command", "guild_id", "command_type"), True),
+        )
+
+
+class CommandUsageDaily(BaseModel):
+    """
+    # CommandUsageDaily
+    Per-day rollup of CommandAnalytics, kept current by the telemetry writer. (For /analytics)
+
+    Same columns as `CommandUsageHourly`, with `bucket` being the start of the day.
+    """
+
+    id = AutoField()
+    bucket = DateTimeField()
+    command = CharField(max_length=100)
+    guild_id = BigIntegerField()
+    command_type = CharField(max_length=32)
+    uses = IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            (("bucket", "command", "guild_id", "command_type"), True),
+        )
+
+
+class SchemaVersion(BaseModel):
+    """
+    # SchemaVersion
+    Migrations that have been applied to this database, see `core/migrations.py`.
+
+    `version`: IntegerField()
+    The migration number.
+
+    `name`: TextField()
+    What the migration does.
+
+    `applied_at`: DateTimeField()
+    When the migration was applied.
+    """
+
+    version = IntegerField(primary_key=True)
+    name = TextField()
+    applied_at = DateTimeField(default=datetime.now)
+
+
 tables = {
+    "SchemaVersion": SchemaVersion,
     "Administrators": Administrators,
     "AdminLogging": AdminLogging,
     "Blacklist": Blacklist,
     "CommandAnalytics": CommandAnalytics,
     "CheckInformation": CheckInformation,
+    "MemberIdentity": MemberIdentity,
+    "MemberAlias": MemberAlias,
     "EventLoggingRecords": EventLoggingRecords,
     "EventQuota": EventQuota,
+    "EventQuotaCount": EventQuotaCount,
     "MaintenanceMode": MaintenanceMode,
+    "CommandUsageHourly": CommandUsageHourly,
+    "CommandUsageDaily": CommandUsageDaily,
 }
 
-"""
-This function automatically adds tables to the database if they do not exist,
-however it does take a significant amount of time to run so the env variable 'PyTestMODE' should be 'False'
-in development. 
-"""
+# Brings the schema up to date. When it already is, this is a single version lookup.
+from core import migrations  # noqa: E402
 
-iter_table(tables)
+migrations.migrate()
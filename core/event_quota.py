@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import discord
+import pytz
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+QUOTA_TIMEZONE = pytz.timezone("America/New_York")
+
+
+def quota_week(when: Optional[datetime] = None) -> datetime:
+    """Start of the quota week (Monday 00:00, America/New_York) that ``when`` falls in, as a naive datetime."""
+    if when is None:
+        when = datetime.now(tz=QUOTA_TIMEZONE)
+    elif when.tzinfo is not None:
+        when = when.astimezone(QUOTA_TIMEZONE)
+    start = when - timedelta(days=when.weekday())
+    return start.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def _bump(counts: Dict[Tuple[int, datetime, str], int]):
+    if not counts:
+        return
+    QC = database.EventQuotaCount
+    (
+        QC.insert_many([
+            {"host_id": host_id, "week": week, "event_type": event_type, "events": events}
+            for (host_id, week, event_type), events in counts.items()
+        ])
+        .on_conflict(
+            conflict_target=database.conflict_target(QC.week, QC.host_id, QC.event_type),
+            update={QC.events: QC.events + database.excluded(QC.events)},
+        )
+        .execute()
+    )
+
+
+def record_event(host_id: int, event_type: str, when: Optional[datetime] = None) -> database.EventQuota:
+    """Store an EventQuota row and bump its counter in the same transaction."""
+    when = when or datetime.now(tz=QUOTA_TIMEZONE)
+    with database.db.atomic():
+        row = database.EventQuota.create(host_id=host_id, event_type=event_type, datetime_object=when)
+        _bump({(host_id, quota_week(when), event_type): 1})
+    return row
+
+
+def rebuild_counts() -> int:
+    """
+    Recompute EventQuotaCount from the raw EventQuota table.
+
+    Returns:
+        int: The number of EventQuota rows counted.
+    """
+    EQ = database.EventQuota
+    counts = defaultdict(int)
+    processed = 0
+    for host_id, event_type, when in EQ.select(EQ.host_id, EQ.event_type, EQ.datetime_object).tuples().iterator():
+        when = datetime.fromisoformat(when) if isinstance(when, str) else when
+        counts[(host_id, quota_week(when), event_type)] += 1
+        processed += 1
+
+    with database.db.atomic():
+        database.EventQuotaCount.delete().execute()
+        _bump(counts)
+    return processed
+
+
+def week_counts(week: Optional[datetime] = None) -> Dict[int, Dict[str, int]]:
+    """Events per host and event type for a quota week, read straight from the counters."""
+    QC = database.EventQuotaCount
+    week = week or quota_week()
+    hosts: Dict[int, Dict[str, int]] = defaultdict(dict)
+    for host_id, event_type, events in (
+        QC.select(QC.host_id, QC.event_type, QC.events).where(QC.week == week).tuples()
+    ):
+        hosts[host_id][event_type] = events
+    return dict(hosts)
+
+
+async def add_event_to_quota(host_id: int, event_type: str) -> database.EventQuota:
+    """Count an event towards its host's quota for this week."""
+    return await database.run_sync(record_event, host_id, event_type)
+
+
+def build_quota_embed(hosts: Dict[int, Dict[str, int]], week: datetime) -> discord.Embed:
+    """One line per host, most events first, with the per-type breakdown."""
+    lines = [f"Events hosted in the week of **{week.strftime('%-m/%-d/%Y')}**.\n"]
+    ranked: List[Tuple[int, Dict[str, int]]] = sorted(hosts.items(), key=lambda item: -sum(item[1].values()))
+    for index, (host_id, by_type) in enumerate(ranked):
+        breakdown = ", ".join(f"{event_type}: {events}" for event_type, events in sorted(by_type.items()))
+        line = f"<@{host_id}> **{sum(by_type.values())}** ({breakdown})"
+        if sum(len(existing) + 1 for existing in lines) + len(line) > 4000:
+            lines.append(f"... and {len(ranked) - index} more hosts")
+            break
+        lines.append(line)
+    if not ranked:
+        lines.append("No events hosted yet.")
+
+    embed = discord.Embed(title="Event Quota", description="\n".join(lines), color=discord.Color.dark_red())
+    embed.set_footer(text=f"Last updated {datetime.now(tz=QUOTA_TIMEZONE).strftime('%-m/%-d %-I:%M %p EST')}")
+    return embed
+
+
+async def update_quota_embed(bot: discord.Client, channel_id: int, message_id: Optional[int] = None) -> Optional[int]:
+    """
+    Edit the quota embed in ``channel_id`` to this week's counts, or post a new one if it can't be found.
+
+    Returns:
+        Optional[int]: The ID of the embed message, None if the channel is unavailable.
+    """
+    week = quota_week()
+    hosts = await database.run_sync(week_counts, week)
+    embed = build_quota_embed(hosts, week)
+
+    channel = bot.get_channel(channel_id)
+    if channel is None:
+        try:
+            channel = await bot.fetch_channel(channel_id)
+        except discord.HTTPException as e:
+            _log.error(f"Quota channel {channel_id} is unavailable: {e}")
+            return None
+
+    if message_id:
+        try:
+            message = await channel.fetch_message(message_id)
+            await message.edit(embed=embed)
+            return message.id
+        except discord.NotFound:
+            _log.warning(f"Quota message {message_id} not found, posting a new one.")
+
+    message = await channel.send(embed=embed)
+    return message.id
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+EXPORT_DIR = Path(os.getenv("EXPORT_DIR", "exports"))
+CHUNK_SIZE = 1000
+
+COLUMNS = (
+    "id",
+    "datetime_object",
+    "host_username",
+    "host_id",
+    "attendee_username",
+    "attendee_id",
+    "event_type",
+    "xp_awarded",
+)
+
+
+def export_events(
+        fmt: str = "csv",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        host_id: Optional[int] = None,
+        host_username: Optional[str] = None,
+) -> tuple[Path, int]:
+    """
+    Stream EventLoggingRecords into a gzip-compressed CSV or JSONL file.
+
+    Rows are read as plain tuples in ``CHUNK_SIZE`` batches keyed on ``id`` and written out batch by batch, so memory
+    stays flat however large the table is, on every backend (a single cursor would stream on SQLite, but psycopg2 and
+    PyMySQL load the whole result set client-side). Meant for its own thread (not the database executor), it keeps
+    its own connection for the run.
+
+    Args:
+        fmt (str): ``"csv"`` or ``"jsonl"``.
+        since (datetime): Only events at or after this time.
+        until (datetime): Only events before this time.
+        host_id (int): Only events hosted by this Discord ID.
+        host_username (str): Only events hosted by this username.
+
+    Returns:
+        tuple[Path, int]: The file written and how many rows it holds.
+    """
+    ELR = database.EventLoggingRecords
+    query = ELR.select(*(getattr(ELR, column) for column in COLUMNS))
+    if since:
+        query = query.where(ELR.datetime_object >= since)
+    if until:
+        query = query.where(ELR.datetime_object < until)
+    if host_id:
+        query = query.where(ELR.host_id == host_id)
+    if host_username:
+        query = query.where(ELR.host_username == host_username)
+    query = query.order_by(ELR.id).limit(CHUNK_SIZE).tuples()
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = EXPORT_DIR / f"events-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.{fmt}.gz"
+
+    written = 0
+    database.db.connect(reuse_if_open=True)
+    try:
+        last_id = 0
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+            while chunk := list(query.where(ELR.id > last_id)):
+                if fmt == "csv":
+                    writer.writerows(chunk)
+                else:
+                    f.writelines(json.dumps(dict(zip(COLUMNS, row)), default=str) + "\n" for row in chunk)
+                written += len(chunk)
+                last_id = chunk[-1][0]
+    finally:
+        database.db.close()
+
+    _log.info(f"Exported {written} event(s) to {path}.")
+    return path, written
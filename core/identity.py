@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+MI = database.MemberIdentity
+MA = database.MemberAlias
+
+
+def normalize(name: str) -> str:
+    return name.strip().lower()
+
+
+def resolve_member(
+        discord_id: Optional[int] = None,
+        username: Optional[str] = None,
+        roblox_id: Optional[int] = None,
+        roblox_username: Optional[str] = None,
+) -> Optional[int]:
+    """
+    Return the canonical member ID for whatever is known about a member, creating or completing the identity.
+
+    Discord and Roblox IDs win over names. A name seen for the first time becomes an alias of the member; a name
+    that already belongs to a member without a Discord ID is adopted by the member that has one. `username` is only
+    an alias (often a Discord display name); `roblox_username` is stored with the Roblox ID and should come from
+    Roblox or the roster. Must run on a database thread, ideally inside the transaction that writes the event.
+
+    Returns:
+        Optional[int]: The member ID, None if nothing identifying was given.
+    """
+    key = normalize(username) if username else None
+    if not (discord_id or roblox_id or key):
+        return None
+
+    member = None
+    if discord_id:
+        member = MI.get_or_none(MI.discord_id == discord_id)
+    if member is None and roblox_id:
+        member = MI.get_or_none(MI.roblox_id == roblox_id)
+
+    alias = MA.get_or_none(MA.name == key) if key else None
+    if member is None and alias is not None:
+        candidate = alias.member
+        # a name-only identity can be claimed, one already tied to another Discord account can't
+        if not discord_id or candidate.discord_id in (None, discord_id):
+            member = candidate
+
+    if member is None:
+        member = MI.create(
+            discord_id=discord_id or None,
+            roblox_id=roblox_id,
+            roblox_username=roblox_username if roblox_id else None,
+        )
+    else:
+        changed = False
+        if discord_id and member.discord_id is None:
+            member.discord_id, changed = discord_id, True
+        if roblox_id and member.roblox_id is None and not MI.select().where(MI.roblox_id == roblox_id).exists():
+            member.roblox_id, member.roblox_username, changed = roblox_id, roblox_username, True
+        elif roblox_username and member.roblox_id == roblox_id and member.roblox_username != roblox_username:
+            # renamed on Roblox, or a display name stored by older versions
+            member.roblox_username, changed = roblox_username, True
+        if changed:
+            member.save()
+
+    if key and alias is None:
+        MA.create(name=key, member=member)
+    return member.id
+
+
+def record_event(
+        host_username: str,
+        host_id: int,
+        attendee_username: str,
+        attendee_id: int,
+        event_type: str,
+        xp_awarded: float,
+        when: datetime,
+        host_roblox_id: Optional[int] = None,
+        attendee_roblox_id: Optional[int] = None,
+        host_roblox_username: Optional[str] = None,
+        attendee_roblox_username: Optional[str] = None,
+) -> database.EventLoggingRecords:
+    """Store an EventLoggingRecords row with its host and attendee resolved to members, in one transaction."""
+    with database.db.atomic():
+        return database.EventLoggingRecords.create(
+            datetime_object=when,
+            host_username=host_username,
+            host_id=host_id,
+            event_type=event_type,
+            attendee_username=attendee_username,
+            attendee_id=attendee_id,
+            xp_awarded=xp_awarded,
+            host_member=resolve_member(host_id, host_username, host_roblox_id, host_roblox_username),
+            attendee_member=resolve_member(
+                attendee_id or None, attendee_username, attendee_roblox_id, attendee_roblox_username
+            ),
+        )
+
+
+def backfill(chunk_size: int = 1000) -> int:
+    """
+    Fill in `host_member`/`attendee_member` on event records that don't have them yet.
+
+    Works through the table in ID order, one transaction per chunk, caching resolutions so every distinct
+    (Discord ID, name) pair is only looked up once. Must not run inside another transaction, or the chunks become
+    savepoints of one long write.
+
+    Returns:
+        int: The number of records updated.
+    """
+    ELR = database.EventLoggingRecords
+    cache: Dict[Tuple[Optional[int], Optional[str]], Optional[int]] = {}
+
+    def member_for(discord_id, username):
+        cache_key = (discord_id or None, normalize(username) if username else None)
+        if cache_key not in cache:
+            cache[cache_key] = resolve_member(discord_id or None, username)
+        return cache[cache_key]
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(
+            ELR.select(ELR.id, ELR.host_id, ELR.host_username, ELR.attendee_id, ELR.attendee_username)
+            .where((ELR.id > last_id) & (ELR.host_member.is_null() | ELR.attendee_member.is_null()))
+            .order_by(ELR.id)
+            .limit(chunk_size)
+            .tuples()
+        )
+        if not rows:
+            break
+        with database.db.atomic():
+            for row_id, host_id, host_username, attendee_id, attendee_username in rows:
+                ELR.update(
+                    host_member=member_for(host_id, host_username),
+                    attendee_member=member_for(attendee_id, attendee_username),
+                ).where(ELR.id == row_id).execute()
+        updated += len(rows)
+        last_id = rows[-1][0]
+
+    if updated:
+        _log.info(f"Linked {updated} event record(s) to {len(set(cache.values()))} member identities.")
+    return updated
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+import discord
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class DisplayNameIndex:
+    """
+    An in-memory, case-normalized display name → member ID multimap per guild.
+
+    Built from the member cache on ready and kept current from the gateway member events, so resolving a display
+    name is a dictionary lookup instead of a scan of the whole member list. Display names are not unique, which is
+    why a lookup returns every matching member ID.
+
+    Methods:
+        build(guild): (Re)build the index for a guild.
+        add(member): Index a member.
+        update(member): Re-index a member whose display name may have changed.
+        remove(guild_id, member_id): Drop a member.
+        lookup(guild_id, display_name): Return every member ID with that display name.
+        resolve(guild_id, display_name): Return the member ID if exactly one member has that display name.
+    """
+
+    def __init__(self):
+        self._ids: Dict[int, Dict[str, Set[int]]] = {}
+        self._names: Dict[int, Dict[int, str]] = {}
+
+    @staticmethod
+    def normalize(display_name: str) -> str:
+        return display_name.strip().casefold()
+
+    def is_indexed(self, guild_id: int) -> bool:
+        return guild_id in self._ids
+
+    def build(self, guild: discord.Guild):
+        self._ids[guild.id] = {}
+        self._names[guild.id] = {}
+        for member in guild.members:
+            self.add(member)
+        _log.info(f"Indexed {len(self._names[guild.id])} display names for {guild.name}.")
+
+    def build_all(self, guilds: Iterable[discord.Guild]):
+        for guild in guilds:
+            self.build(guild)
+
+    def add(self, member: discord.Member):
+        guild_id = member.guild.id
+        if guild_id not in self._ids:
+            return
+        key = self.normalize(member.display_name)
+        self._names[guild_id][member.id] = key
+        self._ids[guild_id].setdefault(key, set()).add(member.id)
+
+    def remove(self, guild_id: int, member_id: int):
+        names = self._names.get(guild_id)
+        if names is None:
+            return
+        key = names.pop(member_id, None)
+        if key is None:
+            return
+        ids = self._ids[guild_id].get(key)
+        if ids is not None:
+            ids.discard(member_id)
+            if not ids:
+                del self._ids[guild_id][key]
+
+    def update(self, member: discord.Member):
+        names = self._names.get(member.guild.id)
+        if names is None or names.get(member.id) == self.normalize(member.display_name):
+            return
+        self.remove(member.guild.id, member.id)
+        self.add(member)
+
+    def lookup(self, guild_id: int, display_name: str) -> FrozenSet[int]:
+        return frozenset(self._ids.get(guild_id, {}).get(self.normalize(display_name), ()))
+
+    def resolve(self, guild_id: int, display_name: str) -> Optional[int]:
+        member_ids = self.lookup(guild_id, display_name)
+        if len(member_ids) == 1:
+            return next(iter(member_ids))
+        if len(member_ids) > 1:
+            _log.warning(f"Display name '{display_name}' is shared by {len(member_ids)} members, not resolving it.")
+        return None
+
+
+display_names = DisplayNameIndex()
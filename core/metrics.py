@@ -0,0 +1,487 @@
+"""
+METRICS
+
+In-process counters, gauges and histograms, served in the Prometheus text format from a small local HTTP endpoint
+(``http://127.0.0.1:9108/metrics`` by default) and summarized by `/command_latency`.
+
+Slash commands are timed by the command tree: ``track_interaction`` starts the clock in the global interaction check
+and ``finish_interaction`` stops it when the command completes or fails. Outgoing API calls are counted with
+``external_call``:
+
+    with metrics.external_call("bloxlink") as call:
+        response = requests.get(...)
+        call.status = response.status_code
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import discord
+import httpx
+from discord import app_commands
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# seconds; Discord drops interactions that aren't answered within 3
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Registry:
+    """
+    Every metric the bot exposes, in registration order.
+
+    Metrics register themselves on creation. Updates come from the event loop and rendering from the HTTP server
+    thread, so both go through ``lock``.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric"):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self.lock:
+            for metric in self.metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                try:
+                    lines.extend(metric.samples())
+                except Exception as e:
+                    _log.error(f"Could not collect metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} takes the labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up, per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, help, label_names)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down.
+
+    Either set directly, or read on every scrape from ``callback``, which returns one number, or a
+    label values -> number mapping when the gauge has labels. ``kind`` can be set to "counter" for totals that
+    another component already keeps. The callback runs on the HTTP server thread while holding ``registry.lock``;
+    whatever it reads beyond plain attributes must be updated under that lock too.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            help: str,
+            label_names: Tuple[str, ...] = (),
+            callback: Optional[Callable[[], object]] = None,
+            kind: str = "gauge",
+    ):
+        super().__init__(name, help, label_names)
+        self.callback = callback
+        self.kind = kind
+        self.values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with registry.lock:
+            self.values[key] = value
+
+    def samples(self) -> List[str]:
+        values = self.values
+        if self.callback is not None:
+            result = self.callback()
+            if isinstance(result, dict):
+                values = {key if isinstance(key, tuple) else (key,): value for key, value in result.items()}
+            else:
+                values = {(): result}
+        return [
+            f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class _Series:
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int):
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """
+    Observations counted into fixed buckets, per label set.
+
+    Methods:
+        observe(value, **labels): Count one observation.
+        quantile(q, **labels): Estimate a quantile from the buckets, the way Prometheus' ``histogram_quantile`` does.
+        series(): Label values -> (count, sum) for every label set seen.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.bounds = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _Series] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.bounds, value)
+        with registry.lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds) + 1)
+            series.buckets[index] += 1
+            series.count += 1
+            series.sum += value
+
+    def series(self) -> Dict[LabelValues, Tuple[int, float]]:
+        return {key: (series.count, series.sum) for key, series in self._series.items()}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        series = self._series.get(self._key(labels))
+        if series is None or series.count == 0:
+            return None
+        rank = q * series.count
+        seen = 0
+        for index, count in enumerate(series.buckets):
+            if seen + count >= rank and count:
+                if index == len(self.bounds):
+                    # past the last bound, all that is known is that it's bigger
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), series.buckets):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(series.sum)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {series.count}")
+        return lines
+
+
+command_seconds = Histogram(
+    "arasaka_command_seconds",
+    "Slash command latency by stage: defer (acknowledged with a defer), first_response (first message, edit or "
+    "modal the user sees, including followups and edits after a defer) and total (until the command returned or "
+    "failed).",
+    ("command", "stage"),
+)
+commands_total = Counter(
+    "arasaka_commands_total", "Slash commands run, by outcome (ok, error, blocked).", ("command", "outcome")
+)
+command_errors = Counter("arasaka_command_errors_total", "Slash command errors by exception type.", ("command", "error"))
+external_seconds = Histogram("arasaka_external_call_seconds", "Latency of calls to outside APIs.", ("service",))
+external_calls = Counter(
+    "arasaka_external_calls_total",
+    "Calls to outside APIs by outcome (2xx, 4xx, 429, 5xx or error when no response came back).",
+    ("service", "outcome"),
+)
+
+
+# -- slash commands --
+
+_STARTED = "metrics_started"
+_DEFERRED = "metrics_deferred"
+_RESPONDED = "metrics_responded"
+
+# task running a slash command -> its name, for naming what blocked the event loop
+_running: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+def _command_name(interaction: discord.Interaction) -> str:
+    command = interaction.command
+    return command.qualified_name if command is not None else "unknown"
+
+
+def _record_response(interaction: discord.Interaction, stage: str):
+    # a defer and the first thing the user sees are each recorded once; a defer doesn't stop the clock for the latter
+    extras = interaction.extras
+    started = extras.get(_STARTED)
+    if started is None:
+        return
+    done = _DEFERRED if stage == "defer" else _RESPONDED
+    if done in extras or (stage == "defer" and _RESPONDED in extras):
+        return
+    extras[done] = time.perf_counter()
+    command_seconds.observe(extras[done] - started, command=_command_name(interaction), stage=stage)
+
+
+class _TimedResponse(discord.InteractionResponse):
+    __slots__ = ()
+
+    async def defer(self, **kwargs):
+        result = await super().defer(**kwargs)
+        _record_response(self._parent, "defer")
+        return result
+
+    async def send_message(self, *args, **kwargs):
+        result = await super().send_message(*args, **kwargs)
+        _record_response(self._parent, "first_response")
+        return result
+
+    async def edit_message(self, *args, **kwargs):
+        result = await super().edit_message(*args, **kwargs)
+        _record_response(self._parent, "first_response")
+        return result
+
+    async def send_modal(self, modal):
+        result = await super().send_modal(modal)
+        _record_response(self._parent, "first_response")
+        return result
+
+
+class _TimedFollowup(discord.Webhook):
+    __slots__ = ("interaction",)
+
+    async def send(self, *args, **kwargs):
+        result = await super().send(*args, **kwargs)
+        _record_response(self.interaction, "first_response")
+        return result
+
+
+class _TimedInteraction(discord.Interaction):
+    """
+    An interaction whose initial response, followups and edits of the original response are timed. Tracked
+    interactions are switched to this class; it adds no state, and `tests/test_metrics.py` checks that it still
+    fits the installed discord.py, whose cached `response`/`followup` slots it fills.
+    """
+
+    __slots__ = ()
+
+    @discord.utils.cached_slot_property("_cs_response")
+    def response(self) -> _TimedResponse:
+        return _TimedResponse(self)
+
+    @discord.utils.cached_slot_property("_cs_followup")
+    def followup(self) -> _TimedFollowup:
+        webhook = _TimedFollowup.from_state(
+            data={"id": self.application_id, "type": 3, "token": self.token}, state=self._state
+        )
+        webhook.interaction = self
+        return webhook
+
+    async def edit_original_response(self, **kwargs):
+        result = await super().edit_original_response(**kwargs)
+        _record_response(self, "first_response")
+        return result
+
+
+def track_interaction(interaction: discord.Interaction):
+    """Start timing an application command; its defer and first visible response are timed from here."""
+    interaction.extras[_STARTED] = time.perf_counter()
+    task = asyncio.current_task()
+    if task is not None:
+        _running[task] = _command_name(interaction)
+    interaction.__class__ = _TimedInteraction
+
+
+def finish_interaction(interaction: discord.Interaction, error: BaseException = None, blocked: bool = False):
+    """
+    Record the total time and outcome of an application command started with ``track_interaction``. Failed checks
+    count as blocked, not as errors.
+    """
+    started = interaction.extras.pop(_STARTED, None)
+    if started is None:
+        return
+    task = asyncio.current_task()
+    if task is not None:
+        _running.pop(task, None)
+    command = _command_name(interaction)
+    if blocked or isinstance(error, app_commands.CheckFailure):
+        commands_total.inc(command=command, outcome="blocked")
+        return
+    command_seconds.observe(time.perf_counter() - started, command=command, stage="total")
+    if error is None:
+        commands_total.inc(command=command, outcome="ok")
+    else:
+        error = getattr(error, "original", error)
+        commands_total.inc(command=command, outcome="error")
+        command_errors.inc(command=command, error=type(error).__name__)
+
+
+def running_command(task: Optional[asyncio.Task]) -> Optional[str]:
+    """Name of the slash command ``task`` is running, if it is running one."""
+    return _running.get(task) if task is not None else None
+
+
+# -- outside APIs --
+
+def _outcome(status: int) -> str:
+    return "429" if status == 429 else f"{status // 100}xx"
+
+
+class external_call:
+    """
+    Context manager timing one call to an outside API. Set ``status`` to the HTTP status when there is one;
+    an exception counts as "error".
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+        self.status: Optional[int] = None
+
+    def __enter__(self) -> "external_call":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        external_seconds.observe(time.perf_counter() - self._started, service=self.service)
+        if exc_type is not None:
+            outcome = "error"
+        elif self.status is None:
+            outcome = "ok"
+        else:
+            outcome = _outcome(self.status)
+        external_calls.inc(service=self.service, outcome=outcome)
+        return False
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Wraps an httpx transport so every request through it is counted as an external call to ``service``."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, service: str):
+        self.transport = transport
+        self.service = service
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        with external_call(self.service) as call:
+            response = await self.transport.handle_async_request(request)
+            call.status = response.status_code
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# -- HTTP endpoint --
+
+class MetricsServer:
+    """
+    Flask app serving ``GET /metrics`` from a daemon thread.
+
+    Attributes:
+        host (str): Interface to listen on, keep it local unless a scraper needs it.
+        port (int): Port to listen on, 0 disables the endpoint.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.port or self._server is not None:
+            return
+        from flask import Flask, Response
+        from werkzeug.serving import make_server
+
+        app = Flask("arasaka-metrics")
+
+        @app.get("/metrics")
+        def metrics():
+            return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+        try:
+            self._server = make_server(self.host, self.port, app, threaded=True)
+        except OSError as e:
+            _log.error(f"Metrics endpoint not started, could not bind {self.host}:{self.port}: {e}")
+            return
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        _log.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+            self._thread = None
+
+
+server = MetricsServer(
+    host=os.getenv("METRICS_HOST", "127.0.0.1"),
+    port=int(os.getenv("METRICS_PORT", "9108")),
+)
@@ -0,0 +1,237 @@
+"""
+SCHEMA MIGRATIONS
+
+Every change to the schema of an existing database is a numbered function in `MIGRATIONS`, applied once and in
+order, and recorded in the `SchemaVersion` table. On startup `migrate()` compares the newest recorded version with
+the newest registered one and does nothing else when they match.
+
+To change the schema: edit the model in `core/database.py`, then register the next migration here, e.g.
+
+    @migration(9, "Add EventQuota.notes")
+    def _(migrator):
+        add_columns(migrator, database.EventQuota, "notes")
+
+Migrations should be safe to re-run (`add_columns` and `create_indexes` skip what already exists), since a brand
+new database is created straight from the current models and every migration is only recorded, not run.
+
+Data fix-ups that write many rows go in `after`, which runs once the schema change has committed and manages its
+own transactions; the version is only recorded when it finishes, so an interrupted one is picked up on next start.
+"""
+from __future__ import annotations
+
+from typing import Callable, List, NamedTuple, Optional
+
+from peewee import ForeignKeyField
+from playhouse.migrate import SchemaMigrator, migrate as run_operations
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[SchemaMigrator], None]
+    after: Optional[Callable[[], None]] = None
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str, after: Optional[Callable[[], None]] = None):
+    """
+    Register the decorated function as migration ``version``. Versions must be registered in order. ``after`` runs
+    outside the migration's transaction, once the decorated function has committed.
+    """
+
+    def decorator(func: Callable[[SchemaMigrator], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} is registered after migration {MIGRATIONS[-1].version}.")
+        MIGRATIONS.append(Migration(version, name, func, after))
+        return func
+
+    return decorator
+
+
+def add_columns(migrator: SchemaMigrator, model, *names: str):
+    """Add model columns that the table does not have yet."""
+    table = model._meta.table_name
+    existing = {column.name for column in database.db.get_columns(table)}
+    operations = [
+        migrator.add_column(table, model._meta.fields[name].column_name, model._meta.fields[name])
+        for name in names
+        if model._meta.fields[name].column_name not in existing
+    ]
+    if operations:
+        run_operations(*operations)
+
+
+def use_varchar(migrator: SchemaMigrator, model, *names: str):
+    """
+    Turn TEXT columns into the VARCHAR their `CharField` declares, skipping columns that already are. SQLite doesn't
+    distinguish the two, so it is left alone.
+    """
+    if database.IS_SQLITE:
+        return
+    table = model._meta.table_name
+    types = {column.name: column.data_type.lower() for column in database.db.get_columns(table)}
+    operations = []
+    for name in names:
+        field = model._meta.fields[name]
+        if types.get(field.column_name, "").startswith("text"):
+            operations.append(migrator.alter_column_type(table, field.column_name, field))
+    if operations:
+        run_operations(*operations)
+
+
+def drop_indexes(migrator: SchemaMigrator, model, *names: str):
+    """Drop indexes by name, skipping those the table doesn't have."""
+    table = model._meta.table_name
+    existing = {index.name for index in database.db.get_indexes(table)}
+    operations = [migrator.drop_index(table, name) for name in names if name in existing]
+    if operations:
+        run_operations(*operations)
+
+
+def create_indexes(*models):
+    """
+    Create every index declared on the models, skipping existing ones and those on columns a later migration adds.
+    """
+    for model in models:
+        columns = {column.name for column in database.db.get_columns(model._meta.table_name)}
+        for index in model._meta.fields_to_index():
+            if all(getattr(field, "column_name", None) in columns for field in index._expressions):
+                database.db.execute(model._schema._create_index(index, safe=True))
+
+
+@migration(1, "Baseline: create missing tables and columns")
+def _(migrator):
+    # databases from before migrations were tracked, this is what iter_table used to check on every boot
+    legacy = [
+        database.Administrators,
+        database.AdminLogging,
+        database.Blacklist,
+        database.CommandAnalytics,
+        database.CheckInformation,
+        database.EventLoggingRecords,
+        database.EventQuota,
+        database.MaintenanceMode,
+    ]
+    existing = set(database.db.get_tables())
+    missing = [model for model in legacy if model._meta.table_name not in existing]
+    # new tables are created from the current models, so the tables their foreign keys point to come first
+    referenced = {rel_model for model in missing for rel_model in model._meta.refs.values()}
+    database.db.create_tables(list(referenced) + missing)
+    for model in legacy:
+        if model._meta.table_name in existing:
+            # foreign keys are added by the later migrations that create the tables they reference
+            add_columns(
+                migrator, model,
+                *(field.name for field in model._meta.sorted_fields if not isinstance(field, ForeignKeyField)),
+            )
+
+
+@migration(2, "Index EventLoggingRecords identity columns")
+def _(migrator):
+    # MySQL can't index the TEXT columns older tables were created with
+    use_varchar(migrator, database.EventLoggingRecords, "host_username", "attendee_username")
+    create_indexes(database.EventLoggingRecords)
+
+
+@migration(3, "Add the CommandAnalytics hourly and daily rollups")
+def _(migrator):
+    database.db.create_tables([database.CommandUsageHourly, database.CommandUsageDaily], safe=True)
+
+
+@migration(4, "Index CommandAnalytics.date and AdminLogging.datetime")
+def _(migrator):
+    create_indexes(database.CommandAnalytics, database.AdminLogging)
+
+
+@migration(5, "Add the EventQuota per-week counters")
+def _(migrator):
+    from core import event_quota
+
+    database.db.create_tables([database.EventQuotaCount], safe=True)
+    event_quota.rebuild_counts()
+
+
+def _link_event_records():
+    from core import identity
+
+    identity.backfill()
+
+
+@migration(6, "Add member identities and link event records to them", after=_link_event_records)
+def _(migrator):
+    database.db.create_tables([database.MemberIdentity, database.MemberAlias], safe=True)
+    add_columns(migrator, database.EventLoggingRecords, "host_member", "attendee_member")
+    create_indexes(database.EventLoggingRecords)
+
+
+@migration(7, "Store indexed and unique string columns as VARCHAR")
+def _(migrator):
+    use_varchar(migrator, database.EventLoggingRecords, "host_username", "attendee_username")
+    use_varchar(migrator, database.CommandUsageHourly, "command", "command_type")
+    use_varchar(migrator, database.CommandUsageDaily, "command", "command_type")
+    use_varchar(migrator, database.EventQuotaCount, "event_type")
+    use_varchar(migrator, database.MemberAlias, "name")
+
+
+@migration(8, "Drop the unused EventLoggingRecords name and Discord ID indexes")
+def _(migrator):
+    # lookups go through the member columns since migration 6
+    drop_indexes(
+        migrator,
+        database.EventLoggingRecords,
+        "eventloggingrecords_host_username_datetime_object",
+        "eventloggingrecords_attendee_username_datetime_object",
+        "eventloggingrecords_host_id_datetime_object",
+        "eventloggingrecords_attendee_id_datetime_object",
+    )
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version() -> int:
+    if not database.SchemaVersion.table_exists():
+        return 0
+    return database.SchemaVersion.select(database.fn.MAX(database.SchemaVersion.version)).scalar() or 0
+
+
+def migrate():
+    """Apply every migration newer than the database, or create a new database from the current models."""
+    database.db.connect(reuse_if_open=True)
+    try:
+        current = current_version()
+        if current >= latest_version():
+            return
+
+        if current == 0 and not database.db.get_tables():
+            with database.db.atomic():
+                database.db.create_tables(list(database.tables.values()))
+                database.SchemaVersion.insert_many(
+                    [{"version": m.version, "name": m.name} for m in MIGRATIONS]
+                ).execute()
+            _log.info(f"Created a new database at schema version {latest_version()}.")
+            return
+
+        database.db.create_tables([database.SchemaVersion], safe=True)
+        migrator = SchemaMigrator.from_database(database.db)
+        for m in MIGRATIONS:
+            if m.version <= current:
+                continue
+            _log.info(f"Applying migration {m.version}: {m.name}")
+            with database.db.atomic():
+                m.apply(migrator)
+                if m.after is None:
+                    database.SchemaVersion.create(version=m.version, name=m.name)
+            if m.after is not None:
+                m.after()
+                database.SchemaVersion.create(version=m.version, name=m.name)
+    finally:
+        database.db.close()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Iterable, List, Optional
+
+# messages asking for events, answered by the auto-response in on_message_
+EVENT_REQUEST_PHRASES = [
+    "lack of events",
+    "EVENT PLZ",
+    "plz another event",
+    "could anyone host any event?",
+    "any events",
+    "when will there be another AR or other events?",
+    "host an event now",
+    "host event",
+    "please host",
+    "please host an event",
+    "event when",
+    "can someone host an event?",
+    "any event soon?",
+    "when’s the next event?",
+    "can we have an event?",
+    "someone host event pls",
+    "pls host event",
+    "more events pls",
+    "why no events?",
+    "is there an event today?",
+    "let’s do an event",
+    "when event",
+    "hosting event?",
+]
+
+
+class _Phrase:
+    __slots__ = ("text", "length", "chars", "matcher")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.chars = tuple(Counter(text).items())
+        # SequenceMatcher caches everything it knows about seq2, only seq1 changes per message
+        self.matcher = SequenceMatcher(None)
+        self.matcher.set_seq2(text)
+
+
+class PhraseMatcher:
+    """
+    Tells if a message is similar to any of a fixed set of phrases, with the same result as checking
+    ``difflib.SequenceMatcher(None, message.lower(), phrase.lower()).ratio() >= threshold`` for every phrase.
+
+    Phrases are lowercased and prepared once. For each message, a phrase is only scored if it survives two cheap
+    upper bounds on its ratio: the length bound (``real_quick_ratio``: matches can't exceed the shorter string),
+    found by bisecting the phrases sorted by length, and the character-count bound (``quick_ratio``: matches can't
+    exceed the shared characters). The first phrase that scores at or above the threshold ends the search.
+
+    Attributes:
+        threshold (float): Minimum similarity ratio for a match.
+        stats (Counter): ``messages``, ``length_rejected``, ``signature_rejected``, ``scored`` and ``matched``.
+    """
+
+    def __init__(self, phrases: Iterable[str], threshold: float = 0.6):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self._phrases: List[_Phrase] = sorted((_Phrase(p.lower()) for p in phrases), key=lambda p: p.length)
+        self._lengths = [p.length for p in self._phrases]
+        self.stats: Counter = Counter()
+
+    @property
+    def phrases(self) -> List[str]:
+        return [p.text for p in self._phrases]
+
+    def _candidates(self, length: int) -> List[_Phrase]:
+        # 2 * min(a, b) / (a + b) >= t  <=>  b within [a * t / (2 - t), a * (2 - t) / t]; widened by one for
+        # rounding, the exact bound is re-checked per phrase
+        t = self.threshold
+        lo = bisect.bisect_left(self._lengths, int(length * t / (2 - t)) - 1)
+        hi = bisect.bisect_right(self._lengths, int(length * (2 - t) / t) + 1)
+        return self._phrases[lo:hi]
+
+    def match(self, message: str) -> Optional[str]:
+        """Return the first phrase ``message`` is similar to, or None."""
+        self.stats["messages"] += 1
+        message = message.lower()
+        length = len(message)
+        candidates = self._candidates(length)
+        if not candidates:
+            self.stats["length_rejected"] += len(self._phrases)
+            return None
+        self.stats["length_rejected"] += len(self._phrases) - len(candidates)
+
+        chars = Counter(message)
+        threshold = self.threshold
+        for phrase in candidates:
+            total = length + phrase.length
+            # real_quick_ratio, exact version of the bisect window above
+            if 2.0 * min(length, phrase.length) / total < threshold:
+                self.stats["length_rejected"] += 1
+                continue
+            # quick_ratio
+            shared = 0
+            for char, count in phrase.chars:
+                available = chars.get(char, 0)
+                shared += count if count < available else available
+            if 2.0 * shared / total < threshold:
+                self.stats["signature_rejected"] += 1
+                continue
+
+            self.stats["scored"] += 1
+            phrase.matcher.set_seq1(message)
+            if phrase.matcher.ratio() >= threshold:
+                self.stats["matched"] += 1
+                return phrase.text
+        return None
+
+    def matches(self, message: str) -> bool:
+        return self.match(message) is not None
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import pytz
+
+from core import database, identity
+from core.logging_module import get_log
+from core.roster import roster
+
+_log = get_log(__name__)
+
+
+class Repository:
+    """
+    Async data access for cogs.
+
+    Every method runs its peewee work through ``database.run_sync``, i.e. on the database executor (a single
+    worker thread by default), so queries queue up behind each other instead of blocking the gateway loop.
+    Cogs can move to it one at a time; the models stay usable directly.
+
+    Methods:
+        recent_events(names, discord_id, limit): Latest events of a member and the total count.
+        event_history(names, discord_id, cursor, older, limit): One keyset page of a member's events.
+        record_event(...): Store an EventLoggingRecords row, linked to the host and attendee's member identities.
+        administrators(min_tier): Administrators at or above a tier.
+        add_administrator(discord_id, tier): Whitelist a user.
+        remove_administrator(discord_id): Remove a user from the whitelist.
+        maintenance_state(): The MaintenanceMode row, created if missing.
+        toggle_maintenance(reason): Flip maintenance mode.
+    """
+
+    async def recent_events(
+            self, names, discord_id: int = None, limit: int = 3
+    ) -> Tuple[List[database.EventLoggingRecords], int]:
+        return await database.run_sync(database.EventLoggingRecords.recent_for, names, discord_id, limit)
+
+    async def event_history(
+            self, names, discord_id: int = None, cursor=None, older: bool = True, limit: int = 10
+    ) -> List[database.EventLoggingRecords]:
+        return await database.run_sync(
+            database.EventLoggingRecords.history_page, names, discord_id, cursor, older, limit
+        )
+
+    async def record_event(
+            self,
+            host_username: str,
+            host_id: int,
+            attendee_username: str,
+            attendee_id: int,
+            event_type: str,
+            xp_awarded: float,
+            when: Optional[datetime] = None,
+    ) -> database.EventLoggingRecords:
+        host_roblox_id = roster.roblox_id_for_discord(host_id)
+        attendee_roblox_id = roster.id_for_username(attendee_username)
+        return await database.run_sync(
+            identity.record_event,
+            host_username=host_username,
+            host_id=host_id,
+            attendee_username=attendee_username,
+            attendee_id=attendee_id,
+            event_type=event_type,
+            xp_awarded=xp_awarded,
+            when=when or datetime.now(tz=pytz.timezone("America/New_York")),
+            host_roblox_id=host_roblox_id,
+            attendee_roblox_id=attendee_roblox_id,
+            host_roblox_username=roster.username_for_id(host_roblox_id) if host_roblox_id else None,
+            attendee_roblox_username=roster.username_for_id(attendee_roblox_id) if attendee_roblox_id else None,
+        )
+
+    async def administrators(self, min_tier: int = 1) -> List[database.Administrators]:
+        return await database.run_sync(
+            list,
+            database.Administrators.select().where(database.Administrators.TierLevel >= min_tier),
+        )
+
+    async def add_administrator(self, discord_id: int, tier: int) -> database.Administrators:
+        return await database.run_sync(database.Administrators.create, discordID=discord_id, TierLevel=tier)
+
+    async def remove_administrator(self, discord_id: int) -> bool:
+        removed = await database.run_sync(
+            database.Administrators.delete().where(database.Administrators.discordID == discord_id).execute
+        )
+        return removed > 0
+
+    async def maintenance_state(self) -> database.MaintenanceMode:
+        return await database.run_sync(self._maintenance_row)
+
+    async def toggle_maintenance(self, reason: str) -> database.MaintenanceMode:
+        def toggle():
+            row = self._maintenance_row()
+            row.enabled = not row.enabled
+            row.reason = reason
+            row.start_time = datetime.now(tz=pytz.timezone("America/New_York"))
+            row.save()
+            return row
+
+        return await database.run_sync(toggle)
+
+    @staticmethod
+    def _maintenance_row() -> database.MaintenanceMode:
+        row = database.MaintenanceMode.get_or_none(database.MaintenanceMode.id == 1)
+        if row is None:
+            row = database.MaintenanceMode.create(id=1, enabled=False, reason="No reason provided.")
+        return row
+
+
+repo = Repository()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Type
+
+from peewee import Field, Model
+
+from core import database
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", "archive"))
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+INCREMENTAL = 2
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    How long rows of an append-only table stay in the hot database.
+
+    `model`: The table.
+    `date_field`: The column that decides a row's age.
+    `keep_days`: Rows older than this are archived and deleted.
+    """
+
+    model: Type[Model]
+    date_field: Field
+    keep_days: int
+
+
+POLICIES = (
+    RetentionPolicy(
+        database.CommandAnalytics,
+        database.CommandAnalytics.date,
+        int(os.getenv("RETENTION_COMMANDANALYTICS_DAYS", "90")),
+    ),
+    RetentionPolicy(
+        database.AdminLogging,
+        database.AdminLogging.datetime,
+        int(os.getenv("RETENTION_ADMINLOGGING_DAYS", "365")),
+    ),
+)
+
+
+def archive_path(model: Type[Model], month: str) -> Path:
+    return ARCHIVE_DIR / f"{model._meta.table_name}-{month}.jsonl.gz"
+
+
+def _month_of(value) -> str:
+    value = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return value.strftime("%Y-%m")
+
+
+def apply_policy(policy: RetentionPolicy, batch_size: int = 500, pause: float = 0.05) -> int:
+    """
+    Move rows older than the policy allows into compressed monthly archive files, then delete them.
+
+    Rows are handled in small batches, each deleted in its own short transaction with a pause in between, so the
+    write lock is never held for long. A batch is written to its archive file before it is deleted; a crash in
+    between can repeat rows in the archive but never loses them.
+
+    Returns:
+        int: The number of rows archived.
+    """
+    model = policy.model
+    cutoff = datetime.now() - timedelta(days=policy.keep_days)
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+
+    archived = 0
+    while True:
+        rows = list(
+            model.select()
+            .where(policy.date_field < cutoff)
+            .order_by(model.id)
+            .limit(batch_size)
+            .dicts()
+        )
+        if not rows:
+            break
+
+        by_month: Dict[str, List[dict]] = {}
+        for row in rows:
+            by_month.setdefault(_month_of(row[policy.date_field.name]), []).append(row)
+        for month, month_rows in by_month.items():
+            # gzip members can be appended, the file still decompresses as one stream
+            with gzip.open(archive_path(model, month), "at", encoding="utf-8") as f:
+                for row in month_rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+
+        with database.db.atomic():
+            model.delete().where(model.id.in_([row["id"] for row in rows])).execute()
+
+        archived += len(rows)
+        time.sleep(pause)
+
+    return archived
+
+
+def enable_incremental_vacuum():
+    """
+    Switch an existing SQLite database to ``auto_vacuum=INCREMENTAL``. SQLite only.
+
+    New databases are created that way (see `SQLITE_PRAGMAS`); older ones need a single full VACUUM, which rebuilds
+    the file under an exclusive lock. This is a startup step, run before the bot serves traffic, and a no-op once the
+    database is converted.
+    """
+    if not database.IS_SQLITE:
+        return
+    if database.db.execute_sql("PRAGMA auto_vacuum").fetchone()[0] == INCREMENTAL:
+        return
+    started = time.perf_counter()
+    _log.info("Switching the database to incremental auto_vacuum, running a one-off VACUUM.")
+    database.db.execute_sql("PRAGMA auto_vacuum = INCREMENTAL")
+    database.db.execute_sql("VACUUM")
+    _log.info(f"Database converted in {time.perf_counter() - started:.1f}s.")
+
+
+def incremental_vacuum(batch_pages: int = 200, max_pages: int = 20000, pause: float = 0.05) -> int:
+    """
+    Hand free pages back to the filesystem in short batches. SQLite only.
+
+    Each batch is its own short write transaction, so the telemetry writer and the database executor get the lock
+    in between. Skipped while the database isn't in incremental auto_vacuum mode.
+
+    Returns:
+        int: The number of pages released.
+    """
+    if not database.IS_SQLITE:
+        return 0
+    if database.db.execute_sql("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL:
+        _log.info("Skipping incremental vacuum, auto_vacuum isn't INCREMENTAL yet.")
+        return 0
+    released = 0
+    while released < max_pages:
+        free = database.db.execute_sql("PRAGMA freelist_count").fetchone()[0]
+        if not free:
+            break
+        pages = min(batch_pages, free, max_pages - released)
+        # executescript steps the pragma to completion, a plain execute only frees the first page
+        database.db.connection().executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        released += pages
+        time.sleep(pause)
+    return released
+
+
+def run() -> Dict[str, int]:
+    """
+    Apply every retention policy and reclaim the freed space.
+
+    Meant for its own thread (not the database executor), it keeps its own connection for the run.
+    """
+    results = {}
+    database.db.connect(reuse_if_open=True)
+    try:
+        for policy in POLICIES:
+            results[policy.model._meta.table_name] = apply_policy(policy)
+        if any(results.values()):
+            incremental_vacuum()
+    finally:
+        database.db.close()
+    return results
@@ -0,0 +1,123 @@
+"""
+ROLE GATES
+
+Named sets of guild roles that may use a command, declared once and checked against the member's role IDs:
+
+    @role_gate("officer_o2_plus")
+    async def update(self, interaction: discord.Interaction, ...):
+
+A member passes a gate if they hold any of its roles, or are in `BYPASS_USERS` when the gate allows it. Gates can
+also name roles (e.g. "Bot Manager"); those are looked up once per guild and remembered until the guild's roles
+are created, renamed or deleted (see `forget_named_roles`).
+"""
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple, Union
+
+import discord
+from discord import app_commands
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+OFFICER_CORPS = 1143736564002861146
+HICOM = 1143736740075552860
+BIGBOSS = 1163157560237510696
+CLAN_LEADER = 1158472045248651434
+O_TWO = 1143729159479234590
+O_THREE = 1156342512500351036
+O_FOUR = 1143729281806127154
+RETIRED_HICOM = 1192942534968758342
+IC = 1176645976723816579
+
+BYPASS_USERS: FrozenSet[int] = frozenset({409152798609899530})
+
+
+class RoleGate(NamedTuple):
+    name: str
+    role_ids: FrozenSet[int]
+    role_names: FrozenSet[str] = frozenset()
+    allow_bypass: bool = True
+
+
+GATES: Dict[str, RoleGate] = {}
+
+
+def register(name: str, role_ids=(), role_names=(), allow_bypass: bool = True) -> RoleGate:
+    """Declare a gate, replacing any gate of the same name."""
+    gate = RoleGate(name, frozenset(role_ids), frozenset(role_names), allow_bypass)
+    GATES[name] = gate
+    return gate
+
+
+register("officer_corps_plus", {OFFICER_CORPS, HICOM, BIGBOSS, CLAN_LEADER})
+register("officer_o2_plus", {O_TWO, O_THREE, O_FOUR, HICOM, RETIRED_HICOM})
+register("officer_o4_plus", {O_FOUR, HICOM, BIGBOSS, CLAN_LEADER})
+register("officer_or_retired_hicom", {OFFICER_CORPS, RETIRED_HICOM})
+register("help_viewers", {OFFICER_CORPS, HICOM, CLAN_LEADER, BIGBOSS, IC}, {"Bot Manager"}, allow_bypass=False)
+
+# (guild ID, role name) -> role ID, None if the guild has no such role
+_named_roles: Dict[Tuple[int, str], Optional[int]] = {}
+
+
+def _role_ids(gate: RoleGate, guild: discord.Guild) -> FrozenSet[int]:
+    if not gate.role_names:
+        return gate.role_ids
+    ids = set(gate.role_ids)
+    for role_name in gate.role_names:
+        key = (guild.id, role_name)
+        if key not in _named_roles:
+            role = discord.utils.get(guild.roles, name=role_name)
+            _named_roles[key] = role.id if role else None
+        if _named_roles[key] is not None:
+            ids.add(_named_roles[key])
+    return frozenset(ids)
+
+
+def forget_named_roles(guild_id: int = None):
+    """Drop remembered name lookups. Called by the bot whenever a guild role is created, renamed or deleted."""
+    for key in [key for key in _named_roles if guild_id is None or key[0] == guild_id]:
+        del _named_roles[key]
+
+
+def member_role_ids(member: discord.Member) -> Iterable[int]:
+    """
+    The IDs of the member's roles. Reads discord.py's raw role ID list so no Role objects are built, falling back to
+    the public ``Member.roles`` if a discord.py version stops providing it (checked by `tests/test_role_gates.py`).
+    """
+    raw = getattr(member, "_roles", None)
+    if raw is not None:
+        return raw
+    return [role.id for role in member.roles]
+
+
+def passes(gate: Union[str, RoleGate], member: Union[discord.Member, discord.User]) -> bool:
+    """If ``member`` may pass ``gate``. Users outside a guild (no roles) only pass through the bypass list."""
+    if isinstance(gate, str):
+        gate = GATES[gate]
+    if gate.allow_bypass and member.id in BYPASS_USERS:
+        return True
+    if not isinstance(member, discord.Member):
+        return False
+    return not _role_ids(gate, member.guild).isdisjoint(member_role_ids(member))
+
+
+class GateFailure(app_commands.CheckFailure):
+    """Raised by `role_gate` checks, answered with the usual "no permission" reply."""
+
+    def __init__(self, gate: RoleGate):
+        self.gate = gate
+        super().__init__(f"Role gate {gate.name!r} not passed.")
+
+
+def role_gate(name: str):
+    """App command check for the named gate."""
+    gate = GATES[name]
+
+    def predicate(interaction: discord.Interaction) -> bool:
+        if passes(gate, interaction.user):
+            return True
+        raise GateFailure(gate)
+
+    return app_commands.check(predicate)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import Dict, NamedTuple, Optional, Set, Tuple, Union
+
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+GROUP_ID = 33764698
+_RANK_PREFIX = re.compile(r"^\[[^\]]*\]\s*")
+
+
+def strip_rank_prefix(role_name: str) -> str:
+    """Turn a Roblox role name like ``[N-1] Sergeant`` into the sheet-style rank name ``Sergeant``."""
+    return _RANK_PREFIX.sub("", role_name).strip()
+
+
+class RosterRole(NamedTuple):
+    id: int
+    name: str
+    rank: int
+    member_count: int
+
+    @property
+    def rank_name(self) -> str:
+        return strip_rank_prefix(self.name)
+
+
+class GroupRoster:
+    """
+    A local index of the Roblox group's members and their roles.
+
+    The index is filled by paging through each role's member list and is refreshed incrementally: a role is only
+    re-paged when its member count changed since the last sync, and every ``full_every`` syncs all roles are
+    re-paged to catch members that swapped roles without changing any count.
+
+    Discord ↔ Roblox links learned from Blox.link are only a cache of it: each one expires after ``link_ttl``
+    seconds, and every full sweep forgets them all, so a member who relinks to another account is picked up again.
+
+    Attributes:
+        group_id (int): The Roblox group that is being mirrored.
+        full_every (int): How many syncs happen between full sweeps.
+        link_ttl (float): Seconds a Discord ↔ Roblox link is trusted before Blox.link is asked again.
+        last_sync (float, optional): ``time.time()`` of the last completed sync.
+
+    Methods:
+        refresh(client, full): Sync the index with Roblox.
+        role_of(roblox_id): Return the member's role.
+        rank_for_username(username): Return the sheet-style rank name of a member.
+        link_discord(discord_id, roblox_id): Remember a Discord ↔ Roblox link.
+        roblox_id_for_discord(discord_id): Return a remembered, unexpired Roblox ID for a Discord user.
+    """
+
+    def __init__(self, group_id: int = GROUP_ID, full_every: int = 12, link_ttl: float = 900.0):
+        self.group_id = group_id
+        self.full_every = full_every
+        self.link_ttl = link_ttl
+        self.last_sync: Optional[float] = None
+
+        self._roles: Dict[int, RosterRole] = {}
+        self._role_members: Dict[int, Set[int]] = {}
+        self._member_role: Dict[int, int] = {}
+        self._usernames: Dict[int, str] = {}
+        self._username_ids: Dict[str, int] = {}
+        # Discord ID -> (Roblox ID, time.monotonic() it was linked)
+        self._discord_links: Dict[int, Tuple[int, float]] = {}
+        self._syncs = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.last_sync is not None
+
+    @property
+    def roles(self):
+        """Roles ordered from highest to lowest rank."""
+        return sorted(self._roles.values(), key=lambda role: role.rank, reverse=True)
+
+    def __len__(self):
+        return len(self._member_role)
+
+    async def refresh(self, client, full: bool = False) -> int:
+        """
+        Sync the index with the group's roles on Roblox.
+
+        Args:
+            client (roblox.Client): The shared Roblox client.
+            full (bool): Re-page every role even if its member count did not change.
+
+        Returns:
+            int: The number of roles that were re-paged.
+        """
+        async with self._lock:
+            full = full or not self.ready or self._syncs % self.full_every == 0
+            group = client.get_base_group(self.group_id)
+            roles = await group.get_roles()
+
+            repaged = 0
+            seen = set()
+            for role in roles:
+                # rank 0 is the guest role, which has no member list
+                if role.rank == 0:
+                    continue
+                seen.add(role.id)
+                entry = RosterRole(role.id, role.name, role.rank, role.member_count or 0)
+                previous = self._roles.get(role.id)
+                self._roles[role.id] = entry
+
+                if not full and previous is not None and previous.member_count == entry.member_count:
+                    continue
+
+                members = set()
+                async for member in role.get_members(page_size=100):
+                    members.add(member.id)
+                    self._usernames[member.id] = member.name
+                    self._username_ids[member.name.casefold()] = member.id
+                self._replace_role_members(role.id, members)
+                repaged += 1
+
+            for role_id in set(self._roles) - seen:
+                self._replace_role_members(role_id, set())
+                del self._roles[role_id]
+
+            if full:
+                self._discord_links.clear()
+
+            self._syncs += 1
+            self.last_sync = time.time()
+            return repaged
+
+    def _replace_role_members(self, role_id: int, members: Set[int]):
+        for roblox_id in self._role_members.get(role_id, set()) - members:
+            # only forget members that have not already been picked up under another role
+            if self._member_role.get(roblox_id) == role_id:
+                del self._member_role[roblox_id]
+                name = self._usernames.pop(roblox_id, None)
+                if name is not None and self._username_ids.get(name.casefold()) == roblox_id:
+                    del self._username_ids[name.casefold()]
+        for roblox_id in members:
+            self._member_role[roblox_id] = role_id
+        self._role_members[role_id] = members
+
+    def role_of(self, roblox_id: int) -> Optional[RosterRole]:
+        role_id = self._member_role.get(roblox_id)
+        return self._roles.get(role_id) if role_id is not None else None
+
+    def role_by_name(self, role_name: str) -> Optional[RosterRole]:
+        """Look up a role by its full Roblox name or its sheet-style rank name."""
+        for role in self._roles.values():
+            if role.name == role_name or role.rank_name == role_name:
+                return role
+        return None
+
+    def id_for_username(self, username: str) -> Optional[int]:
+        return self._username_ids.get(username.casefold())
+
+    def username_for_id(self, roblox_id: int) -> Optional[str]:
+        return self._usernames.get(roblox_id)
+
+    def rank_for_id(self, roblox_id: int) -> Optional[str]:
+        role = self.role_of(roblox_id)
+        return role.rank_name if role else None
+
+    def rank_for_username(self, username: str) -> Optional[str]:
+        roblox_id = self.id_for_username(username)
+        return self.rank_for_id(roblox_id) if roblox_id is not None else None
+
+    def link_discord(self, discord_id: int, roblox_id: Union[int, str]):
+        self._discord_links[discord_id] = (int(roblox_id), time.monotonic())
+
+    def roblox_id_for_discord(self, discord_id: int) -> Optional[int]:
+        """The Roblox ID last linked to ``discord_id``, None if unknown or older than ``link_ttl``."""
+        link = self._discord_links.get(discord_id)
+        if link is None:
+            return None
+        roblox_id, linked_at = link
+        if time.monotonic() - linked_at >= self.link_ttl:
+            del self._discord_links[discord_id]
+            return None
+        return roblox_id
+
+    def assignable_roles(self, officer_roblox_id: int):
+        """
+        Return the roles an officer may assign, highest first.
+
+        Returns:
+            list or None: Roles ranked strictly below the officer, or None if the officer is not in the index.
+        """
+        officer_role = self.role_of(officer_roblox_id)
+        if officer_role is None:
+            return None
+        return [role for role in self.roles if role.rank < officer_role.rank]
+
+
+roster = GroupRoster()
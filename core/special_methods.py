@@ -3,7 +3,6 @@ from __future__ import annotations
 import os
 import subprocess
 import traceback
-import difflib
 from datetime import datetime
 from difflib import get_close_matches
 from pathlib import Path
@@ -13,67 +12,25 @@ import sentry_sdk
 from discord.ext import commands
 from discord import app_commands, ui
 
-from core import database
+from core import database, retention, telemetry
 from core.common import (
     ConsoleColors,
     Colors,
 )
+from core.auto_response import auto_responder
 from core.logging_module import get_log
+from core.role_gates import GateFailure
 
 _log = get_log(__name__)
-target_phrases = [
-    "lack of events",
-    "EVENT PLZ",
-    "plz another event",
-    "could anyone host any event?",
-    "any events",
-    "when will there be another AR or other events?",
-    "host an event now",
-    "host event",
-    "please host",
-    "please host an event",
-    "event when",
-    "can someone host an event?",
-    "any event soon?",
-    "when’s the next event?",
-    "can we have an event?",
-    "someone host event pls",
-    "pls host event",
-    "more events pls",
-    "why no events?",
-    "is there an event today?",
-    "let’s do an event",
-    "when event",
-    "hosting event?"
-]
-
-
-def is_similar(message, phrases, threshold=0.6):
-    """
-    Check if a message is similar to any of the provided phrases.
-    Args:
-        message (str): The user message to check.
-        phrases (list): List of target phrases.
-        threshold (float): Similarity threshold (0 to 1).
-    Returns:
-        bool: True if similar, False otherwise.
-    """
-    message = message.lower()
-    for phrase in phrases:
-        similarity = difflib.SequenceMatcher(None, message, phrase.lower()).ratio()
-        if similarity >= threshold:
-            return True
-    return False
 
 
 async def before_invoke_(ctx: commands.Context):
-    q = database.CommandAnalytics.create(
+    telemetry.record_command(
         command=ctx.command.name,
         user=ctx.author.id,
-        date=datetime.now(),
         command_type="regular",
         guild_id=ctx.guild.id,
-    ).save()
+    )
 
     # Set user context for Sentry
     sentry_sdk.set_user(None)
@@ -129,22 +86,17 @@ async def before_invoke_(ctx: commands.Context):
 
 async def on_ready_(bot):
     now = datetime.now()
-    query: database.CheckInformation = (
-        database.CheckInformation.select()
-        .where(database.CheckInformation.id == 1)
-        .get()
-    )
+    def _claim_persistent_views() -> bool:
+        CI = database.CheckInformation
+        return CI.update(PersistantChange=True).where((CI.id == 1) & (CI.PersistantChange == False)).execute() > 0  # noqa: E712
 
-    if not query.PersistantChange:
+    if await database.run_sync(_claim_persistent_views):
         # Add the DeleteView as a persistent view
         bot.add_view(DeleteView())
 
-        query.PersistantChange = True
-        query.save()
-
-    if not os.getenv("USEREAL"):
+    if not database.IS_SQLITE:
         IP = os.getenv("DATABASE_IP")
-        databaseField = f"{ConsoleColors.OKGREEN}Selected Database: External ({IP}){ConsoleColors.ENDC}"
+        databaseField = f"{ConsoleColors.OKGREEN}Selected Database: External {database.BACKEND} ({IP}){ConsoleColors.ENDC}"
     else:
         databaseField = (
             f"{ConsoleColors.FAIL}Selected Database: localhost{ConsoleColors.ENDC}\n{ConsoleColors.WARNING}WARNING: Not "
@@ -218,6 +170,7 @@ def initializeDB(bot):
     )
     query.PersistantChange = False
     query.save()
+    retention.enable_incremental_vacuum()
     database.db.close()
 
 
@@ -404,6 +357,13 @@ async def on_app_command_error_(bot, interaction: discord.Interaction, error: ap
     if isinstance(error, app_commands.CommandNotFound):
         return
 
+    elif isinstance(error, GateFailure):
+        if not interaction.response.is_done():
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+        else:
+            await interaction.followup.send("You do not have permission to use this command.", ephemeral=True)
+        return
+
     elif isinstance(error, app_commands.MissingPermissions):
         embed = discord.Embed(
             title="Missing Permissions",
@@ -505,14 +465,6 @@ class DeleteView(ui.View):
 
 
 async def on_message_(bot, message: discord.Message):
-    if message.author.bot:
-        return
-
-    guild = bot.get_guild(1143709921326682182)
-    high_command = guild.get_role(1143736740075552860)
-    officer_role = guild.get_role(1154522379654008882)
-
-    if is_similar(message.content, target_phrases, threshold=0.6) and not message.author.bot:
-        if not (high_command in message.author.roles or officer_role in message.author.roles):
-            view = DeleteView()
-            await message.channel.send(f"{message.author.mention} use <#1359919471271215226>", view=view)
+    if auto_responder.should_reply(message):
+        view = DeleteView()
+        await message.channel.send(f"{message.author.mention} use <#1359919471271215226>", view=view)
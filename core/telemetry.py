@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+
+from peewee import Model
+
+from core import analytics, database, metrics
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class TelemetryWriter:
+    """
+    Write-behind queue for append-only telemetry tables (``CommandAnalytics``, ``AdminLogging``).
+
+    Rows are buffered in memory and written with one ``insert_many`` per table inside a single transaction,
+    either when ``batch_size`` rows are pending or every ``flush_interval`` seconds, so command handlers never
+    wait on a database write. CommandAnalytics rows also update the usage rollups in that transaction.
+
+    Attributes:
+        batch_size (int): Pending rows that trigger an early flush.
+        flush_interval (float): Seconds between periodic flushes.
+        max_pending (int): Rows kept while the database is unavailable before the oldest are dropped.
+
+    Methods:
+        enqueue(model, **row): Buffer a row for ``model``.
+        start(): Start the background flusher.
+        stop(): Stop the flusher and write out everything still pending.
+        flush(): Write out everything pending now.
+        stats(): Queue depth and flush counters.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: List[Tuple[Type[Model], dict]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.high_water = 0
+        self.enqueued_total = 0
+        self.written_total = 0
+        self.dropped_total = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, model: Type[Model], **row):
+        self._pending.append((model, row))
+        self.enqueued_total += 1
+
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped_total += overflow
+            _log.warning(f"Telemetry queue full, dropped {overflow} row(s).")
+
+        self.high_water = max(self.high_water, len(self._pending))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="telemetry-writer")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._pending:
+            _log.error(f"Shut down with {len(self._pending)} telemetry row(s) unwritten.")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+
+            rows_by_model: Dict[Type[Model], List[dict]] = defaultdict(list)
+            for model, row in batch:
+                rows_by_model[model].append(row)
+
+            started = time.perf_counter()
+            try:
+                await database.run_sync(self._write, rows_by_model)
+            except Exception as e:
+                # put the batch back in front of anything queued meanwhile, the next flush retries it
+                self._pending[:0] = batch
+                self.failed_flushes += 1
+                _log.error(f"Telemetry flush of {len(batch)} row(s) failed: {e}")
+                return 0
+
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.written_total += len(batch)
+            return len(batch)
+
+    @staticmethod
+    def _write(rows_by_model: Dict[Type[Model], List[dict]]):
+        with database.db.atomic():
+            for model, rows in rows_by_model.items():
+                model.insert_many(rows).execute()
+                if model is database.CommandAnalytics:
+                    analytics.apply_rollups(rows)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "high_water": self.high_water,
+            "enqueued": self.enqueued_total,
+            "written": self.written_total,
+            "dropped": self.dropped_total,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+
+writer = TelemetryWriter(
+    batch_size=int(os.getenv("TELEMETRY_BATCH_SIZE", "100")),
+    flush_interval=int(os.getenv("TELEMETRY_FLUSH_MS", "2000")) / 1000,
+)
+
+
+def record_command(command: str, guild_id: int, user: int, command_type: str):
+    """Queue a ``CommandAnalytics`` row."""
+    writer.enqueue(
+        database.CommandAnalytics,
+        command=command,
+        guild_id=guild_id,
+        user=user,
+        date=datetime.now(),
+        command_type=command_type,
+    )
+
+
+def record_admin_action(discord_id: int, action: str, content: str = "N/A"):
+    """Queue an ``AdminLogging`` row."""
+    writer.enqueue(
+        database.AdminLogging,
+        discordID=discord_id,
+        action=action,
+        content=content,
+        datetime=datetime.now(),
+    )
+
+
+metrics.Gauge(
+    "arasaka_telemetry_queue_depth", "Telemetry rows waiting to be written.", callback=lambda: writer.depth
+)
+metrics.Gauge(
+    "arasaka_telemetry_rows_total",
+    "Telemetry rows by fate (enqueued, written, dropped).",
+    ("fate",),
+    callback=lambda: {
+        "enqueued": writer.enqueued_total, "written": writer.written_total, "dropped": writer.dropped_total
+    },
+    kind="counter",
+)
@@ -0,0 +1,208 @@
+"""
+EVENT LOOP WATCHDOG
+
+Measures how late the event loop runs a short sleep, over and over. Blocking calls made from coroutines (gspread,
+``requests``, the synchronous OpenAI client, peewee outside ``run_sync``) show up as lag.
+
+A helper thread watches the heartbeat. Once it is ``threshold`` seconds overdue, the thread captures the loop
+thread's stack while the call is still blocking, along with the slash command or task that is running. When the
+loop wakes up, the stall is logged, counted in the metrics and kept for `/lag_report`.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Deque, List, NamedTuple, Optional, Tuple
+
+from core import metrics
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+STACK_DEPTH = 25
+
+loop_lag_seconds = metrics.Histogram(
+    "arasaka_event_loop_lag_seconds",
+    "How late the event loop woke up from the watchdog's sleep.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+loop_stalls = metrics.Counter(
+    "arasaka_event_loop_stalls_total",
+    "Times the event loop was blocked past the watchdog threshold, by the command or coroutine blocking it.",
+    ("culprit",),
+)
+
+
+class Stall(NamedTuple):
+    """
+    # Stall
+    One time the event loop was blocked past the threshold.
+
+    `started`: when the loop stopped responding
+    `seconds`: how long it was blocked
+    `culprit`: the slash command (``/xp_manage update``) or coroutine that was running, "unknown" if not captured
+    `where`: innermost frame in the bot's own code, ``file:line in function``
+    `stack`: the captured stack, innermost frame last
+    """
+    started: datetime
+    seconds: float
+    culprit: str
+    where: str
+    stack: Tuple[str, ...]
+
+
+class LoopWatchdog:
+    """
+    Event loop lag monitor.
+
+    Attributes:
+        interval (float): Seconds between heartbeats.
+        threshold (float): Lag in seconds that counts as a stall and triggers a stack capture.
+        last_lag (float): Lag of the most recent heartbeat.
+        stalls (deque): The most recent `Stall` records, newest last.
+        stall_count (int): Stalls since startup.
+        worst (Stall): Longest stall since startup.
+
+    Methods:
+        start(): Start the heartbeat and the helper thread, from inside the running loop.
+        stop(): Stop both.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.5, keep: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.last_lag = 0.0
+        self.stalls: Deque[Stall] = deque(maxlen=keep)
+        self.stall_count = 0
+        self.worst: Optional[Stall] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        # (heartbeat it belongs to, culprit, stack) captured by the helper thread during the current stall
+        self._capture: Optional[Tuple[float, str, traceback.StackSummary]] = None
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._beat(), name="loop-watchdog")
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._thread = None
+
+    async def _beat(self):
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.interval)
+            previous_beat, self._last_beat = self._last_beat, now
+            self.last_lag = lag
+            loop_lag_seconds.observe(lag)
+            if lag >= self.threshold:
+                self._record_stall(previous_beat, lag)
+
+    def _watch(self):
+        # helper thread: only wakes up every interval and compares timestamps until the loop falls behind
+        while not self._stopping.wait(self.interval):
+            beat = self._last_beat
+            if time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            with self._lock:
+                if self._capture is not None and self._capture[0] == beat:
+                    continue
+            try:
+                culprit, stack = self._capture_loop_thread()
+            except Exception as e:
+                _log.error(f"Could not capture the event loop's stack: {e}")
+                continue
+            with self._lock:
+                self._capture = (beat, culprit, stack)
+
+    def _capture_loop_thread(self) -> Tuple[str, traceback.StackSummary]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame, limit=STACK_DEPTH) if frame is not None else traceback.StackSummary()
+        task = asyncio.current_task(self._loop)
+        command = metrics.running_command(task)
+        if command is not None:
+            culprit = f"/{command}"
+        elif task is not None:
+            culprit = getattr(task.get_coro(), "__qualname__", task.get_name())
+        else:
+            culprit = "loop callback"
+        return culprit, stack
+
+    def _record_stall(self, beat: float, lag: float):
+        with self._lock:
+            capture, self._capture = self._capture, None
+        if capture is not None and capture[0] == beat:
+            _, culprit, stack = capture
+        else:
+            # recovered before the helper thread looked
+            culprit, stack = "unknown", traceback.StackSummary()
+
+        stall = Stall(
+            started=datetime.now() - timedelta(seconds=lag),
+            seconds=lag,
+            culprit=culprit,
+            where=_innermost_own_frame(stack),
+            stack=tuple(line.rstrip() for line in stack.format()),
+        )
+        self.stalls.append(stall)
+        self.stall_count += 1
+        if self.worst is None or lag > self.worst.seconds:
+            self.worst = stall
+        loop_stalls.inc(culprit=culprit)
+        _log.warning(
+            f"Event loop blocked for {lag:.2f}s by {culprit} at {stall.where}"
+            + (":\n" + "\n".join(stall.stack) if stall.stack else "")
+        )
+
+    def recent(self, count: int = 5) -> List[Stall]:
+        """The newest ``count`` stalls, newest first."""
+        return list(self.stalls)[-count:][::-1]
+
+
+def _innermost_own_frame(stack: traceback.StackSummary) -> str:
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename \
+                and not frame.filename.endswith("watchdog.py"):
+            return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return "outside the bot's code"
+
+
+watchdog = LoopWatchdog(
+    interval=int(os.getenv("LOOP_LAG_INTERVAL_MS", "100")) / 1000,
+    threshold=int(os.getenv("LOOP_LAG_THRESHOLD_MS", "500")) / 1000,
+)
+
+metrics.Gauge(
+    "arasaka_event_loop_lag_last_seconds", "Lag of the watchdog's most recent heartbeat.",
+    callback=lambda: watchdog.last_lag,
+)
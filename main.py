@@ -12,7 +12,6 @@ import faulthandler
 import logging
 import os
 import time
-from datetime import datetime
 
 import discord
 from alive_progress import alive_bar
@@ -25,9 +24,12 @@ from sentry_sdk.integrations.flask import FlaskIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 from sentry_sdk.integrations.aiohttp import AioHttpIntegration
 
-from core import database
-from core.common import get_extensions
+from core import database, metrics, role_gates, telemetry
+from core.watchdog import watchdog
+from core.checks import blacklist, maintenance, permits
+from core.common import get_extensions, RobloxClient
 from core.logging_module import get_log
+from core.member_index import display_names
 from core.special_methods import (
     initializeDB,
     on_ready_, on_command_error_, on_message_, DeleteView,
@@ -43,15 +45,9 @@ _log.info("Starting ArasakaBot...")
 
 
 async def officer_check(guild: discord.Guild, user: discord.User, interaction: discord.Interaction):
-    Officer_Corps = discord.utils.get(interaction.guild.roles, id=1143736564002861146)
-    HICOM = discord.utils.get(interaction.guild.roles, id=1143736740075552860)
-    BIGBOSS = discord.utils.get(interaction.guild.roles, id=1163157560237510696)
-    ClanLeader = discord.utils.get(interaction.guild.roles, id=1158472045248651434)
-    user = guild.get_member(user.id)
-
-    if not any(role in user.roles for role in
-               [HICOM, BIGBOSS, ClanLeader, Officer_Corps]) and user.id not in [
-        409152798609899530]:
+    user = guild.get_member(user.id) or user
+
+    if not role_gates.passes("officer_corps_plus", user):
         return await interaction.response.send_message("You do not have permission to use this command.",
                                                        ephemeral=True)
 
@@ -62,45 +58,34 @@ class ArasakaSlashTree(app_commands.CommandTree):
         self.bot = bot
 
     async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
-        blacklisted_users = [p.discordID for p in database.Blacklist]
+        if interaction.type == discord.InteractionType.application_command:
+            metrics.track_interaction(interaction)
+        allowed = await self._interaction_allowed(interaction)
+        if not allowed:
+            metrics.finish_interaction(interaction, blocked=True)
+        return allowed
+
+    async def _interaction_allowed(self, interaction: discord.Interaction) -> bool:
         if interaction.user.avatar is None:
             await interaction.response.send_message(
                 "Due to a discord limitation, you must have an avatar set to use this command.")
             return False
-        if interaction.user.id in blacklisted_users:
+        if blacklist.is_blacklisted(interaction.user.id):
             await interaction.response.send_message(
                 "You have been blacklisted from using commands!", ephemeral=True
             )
             return False
 
-        # Check if maintenance mode is enabled
-        maintenance_check = database.MaintenanceMode.select().where(database.MaintenanceMode.id == 1)
-        if not maintenance_check.exists():
-            query = database.MaintenanceMode.create(enabled=False, reason="No reason provided.")
-        else:
-            query = maintenance_check.get()
-
-        if query.enabled:
-            # Get admin level 4 users (owners)
-            admin_ids = []
-            query = database.Administrators.select().where(
-                database.Administrators.TierLevel >= 4
+        if maintenance.blocks(interaction.user.id):
+            embed = discord.Embed(
+                title="Maintenance Mode",
+                description="The bot is currently in maintenance mode. Only bot owners can use commands at this time.",
+                color=discord.Color.red()
             )
-            for admin in query:
-                admin_ids.append(admin.discordID)
-
-            # If user is not an owner and maintenance mode is enabled, reject the interaction
-
-            if interaction.user.id not in admin_ids:
-                embed = discord.Embed(
-                    title="Maintenance Mode",
-                    description="The bot is currently in maintenance mode. Only bot owners can use commands at this time.",
-                    color=discord.Color.red()
-                )
-                embed.add_field(name="Information", value=f"Maintenance Started: {discord.utils.format_dt(maintenance_check.start_time, style='R')}\nNotes: {maintenance_check.reason}\n\nIf you need to use the bot immediately, please contact Triage.")
-                embed.set_footer(text="Please check back later.")
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                return False
+            embed.add_field(name="Information", value=f"Maintenance Started: {discord.utils.format_dt(maintenance.start_time, style='R')}\nNotes: {maintenance.reason}\n\nIf you need to use the bot immediately, please contact Triage.")
+            embed.set_footer(text="Please check back later.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return False
 
         return True
 
@@ -108,6 +93,7 @@ class ArasakaSlashTree(app_commands.CommandTree):
             self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ):
         print(error)
+        metrics.finish_interaction(interaction, error)
         from core.special_methods import on_app_command_error_
         await on_app_command_error_(self.bot, interaction, error)
 
@@ -132,8 +118,39 @@ class ArasakaBot(commands.Bot):
         self._start_time = uptime
 
     async def on_ready(self):
+        display_names.build_all(self.guilds)
         await on_ready_(self)
 
+    async def on_member_join(self, member: discord.Member):
+        display_names.add(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        display_names.update(after)
+
+    async def on_member_remove(self, member: discord.Member):
+        display_names.remove(member.guild.id, member.id)
+
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        # global name changes show up as display name changes for members without a nickname
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member is not None:
+                display_names.update(member)
+
+    # role gates remember which role a name refers to, including "no such role"
+    async def on_guild_role_create(self, role: discord.Role):
+        role_gates.forget_named_roles(role.guild.id)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            role_gates.forget_named_roles(after.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        role_gates.forget_named_roles(role.guild.id)
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command) -> None:
+        metrics.finish_interaction(interaction)
+
     async def on_command_error(self, context, exception) -> None:
         await on_command_error_(self, context, exception)
 
@@ -155,6 +172,21 @@ class ArasakaBot(commands.Bot):
                     raise commands.ExtensionNotFound(ext)
                 bar()
         self.add_view(DeleteView())
+        await permits.refresh()
+        await blacklist.refresh()
+        await maintenance.refresh()
+        telemetry.writer.start()
+        metrics.server.start()
+        watchdog.start()
+
+    async def close(self) -> None:
+        await super().close()
+        await watchdog.stop()
+        # write out buffered telemetry and release the pooled Roblox HTTP session
+        await telemetry.writer.stop()
+        await RobloxClient.close_shared()
+        metrics.server.stop()
+        database.close()
 
     async def is_owner(self, user: discord.User):
         """admin_ids = []
@@ -212,14 +244,13 @@ bot = ArasakaBot(time.time())
 @bot.event
 async def on_interaction(interaction: discord.Interaction):
     if interaction.type == discord.InteractionType.application_command:
-        # Log command analytics to database
-        database.CommandAnalytics.create(
+        # Queue command analytics, the telemetry writer batches them into the database
+        telemetry.record_command(
             command=interaction.command.name,
             guild_id=interaction.guild.id,
             user=interaction.user.id,
-            date=datetime.now(),
             command_type="slash",
-        ).save()
+        )
 
         # Set user context for Sentry
         sentry_sdk.set_user(None)
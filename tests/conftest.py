@@ -0,0 +1,79 @@
+"""
+Shared fixtures.
+
+`db` runs a test once per database backend: SQLite always, PostgreSQL when `TEST_POSTGRES_URL` points at a database
+the tests may wipe, e.g. ``postgresql://postgres@127.0.0.1:5432/arasaka_test``. The models are bound to an empty
+database for the test and bound back afterwards.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["PyTestMODE"] = "1"
+os.environ["DATABASE_BACKEND"] = "sqlite"
+# core.database opens and migrates data.db in the working directory on import, keep it out of the checkout
+os.chdir(tempfile.mkdtemp(prefix="arasaka-tests-"))
+
+from peewee import SqliteDatabase  # noqa: E402
+from playhouse.pool import PooledPostgresqlDatabase  # noqa: E402
+
+from core import database  # noqa: E402
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+BACKENDS = [
+    "sqlite",
+    pytest.param("postgres", marks=pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")),
+]
+
+
+def _postgres() -> PooledPostgresqlDatabase:
+    url = urlsplit(POSTGRES_URL)
+    return PooledPostgresqlDatabase(
+        url.path.lstrip("/"),
+        host=url.hostname,
+        port=url.port or 5432,
+        user=url.username,
+        password=url.password,
+        max_connections=4,
+    )
+
+
+@pytest.fixture(params=BACKENDS)
+def db(request, tmp_path, monkeypatch):
+    models = list(database.tables.values())
+    if request.param == "sqlite":
+        test_db = SqliteDatabase(str(tmp_path / "test.db"), pragmas=database.SQLITE_PRAGMAS)
+    else:
+        test_db = _postgres()
+
+    original = database.db
+    monkeypatch.setattr(database, "db", test_db)
+    monkeypatch.setattr(database, "IS_SQLITE", request.param == "sqlite")
+    monkeypatch.setattr(database, "BACKEND", request.param)
+    test_db.bind(models)
+    test_db.connect()
+    if request.param != "sqlite":
+        test_db.execute_sql("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+
+    yield test_db
+
+    if not test_db.is_closed():
+        test_db.close()
+    if isinstance(test_db, PooledPostgresqlDatabase):
+        test_db.close_all()
+    original.bind(models)
+
+
+@pytest.fixture
+def migrated(db):
+    from core import migrations
+
+    migrations.migrate()
+    db.connect(reuse_if_open=True)
+    return db
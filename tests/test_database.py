@@ -0,0 +1,196 @@
+import csv
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from peewee import BigIntegerField, DateTimeField, FloatField, Model, TextField
+
+from core import analytics, database, event_quota, export, identity, migrations
+
+ELR = database.EventLoggingRecords
+START = datetime(2025, 3, 1, 12, 0)
+
+
+def _event(host, host_id, attendee, attendee_id, minutes, event_type="Training"):
+    return identity.record_event(
+        host_username=host,
+        host_id=host_id,
+        attendee_username=attendee,
+        attendee_id=attendee_id,
+        event_type=event_type,
+        xp_awarded=1.0,
+        when=START + timedelta(minutes=minutes),
+    )
+
+
+# -- migrations --
+
+def test_new_database_is_created_at_the_latest_version(migrated):
+    assert migrations.current_version() == migrations.latest_version()
+    assert set(migrated.get_tables()) >= {model._meta.table_name for model in database.tables.values()}
+    recorded = [version for version, in database.SchemaVersion.select(database.SchemaVersion.version).tuples()]
+    assert sorted(recorded) == [m.version for m in migrations.MIGRATIONS]
+
+
+def test_migrate_is_a_noop_when_current(migrated):
+    migrations.migrate()
+    migrated.connect(reuse_if_open=True)
+    assert database.SchemaVersion.select().count() == len(migrations.MIGRATIONS)
+
+
+def test_legacy_database_is_migrated_in_order(db, monkeypatch):
+    class EventLoggingRecords(Model):  # same name as the model, peewee names indexes after it
+        # the table as it was before migrations were tracked (TEXT names, no member links), with the name and ID
+        # indexes older versions of migration 2 added
+        host_username = TextField()
+        host_id = BigIntegerField()
+        attendee_username = TextField()
+        attendee_id = BigIntegerField(default=0)
+        event_type = TextField()
+        xp_awarded = FloatField()
+        datetime_object = DateTimeField()
+
+        class Meta:
+            database = db
+            table_name = "eventloggingrecords"
+            indexes = (
+                (("host_username", "datetime_object"), False),
+                (("attendee_username", "datetime_object"), False),
+                (("host_id", "datetime_object"), False),
+                (("attendee_id", "datetime_object"), False),
+            )
+
+    EventLoggingRecords.create_table()
+    database.EventQuota._schema.create_table()
+    EventLoggingRecords.insert_many([
+        {"host_username": "Host", "host_id": 1, "attendee_username": "Alice", "event_type": "Training",
+         "xp_awarded": 1.0, "datetime_object": START},
+        {"host_username": "Host", "host_id": 1, "attendee_username": "alice", "event_type": "Training",
+         "xp_awarded": 1.0, "datetime_object": START + timedelta(minutes=1)},
+    ]).execute()
+    database.EventQuota.create(host_id=1, event_type="Training", datetime_object=START)
+    # the backfill commits chunk by chunk, so it must not run inside the migration's transaction
+    in_transaction = []
+    backfill = identity.backfill
+    monkeypatch.setattr(identity, "backfill", lambda: in_transaction.append(db.in_transaction()) or backfill())
+
+    migrations.migrate()
+    db.connect(reuse_if_open=True)
+
+    assert migrations.current_version() == migrations.latest_version()
+    assert database.SchemaVersion.select().count() == len(migrations.MIGRATIONS)
+    assert in_transaction == [False]
+    records = list(ELR.select().order_by(ELR.id))
+    assert {record.attendee_member_id for record in records} == set(database.MemberIdentity.ids_for(["alice"]))
+    assert all(record.host_member_id is not None for record in records)
+    assert database.EventQuotaCount.get().events == 1
+    assert ELR.recent_for(["Alice"])[1] == 2
+    indexed = {tuple(index.columns) for index in db.get_indexes("eventloggingrecords") if not index.unique}
+    assert indexed == {("host_member_id", "datetime_object"), ("attendee_member_id", "datetime_object")}
+
+
+# -- identities --
+
+def test_display_names_are_not_stored_as_roblox_usernames(migrated):
+    identity.record_event(
+        host_username="Host Display", host_id=1, attendee_username="alice", attendee_id=0, event_type="Training",
+        xp_awarded=1.0, when=START, host_roblox_id=100, attendee_roblox_id=200, attendee_roblox_username="Alice",
+    )
+
+    MI = database.MemberIdentity
+    assert MI.get(MI.roblox_id == 100).roblox_username is None
+    assert MI.get(MI.roblox_id == 200).roblox_username == "Alice"
+
+    identity.resolve_member(1, "Host Display", 100, "HostOnRoblox")
+    assert MI.get(MI.roblox_id == 100).roblox_username == "HostOnRoblox"
+
+
+# -- upserts --
+
+def test_rollup_upserts_add_up(migrated):
+    rows = [
+        {"date": START, "command": "ping", "guild_id": 1, "command_type": "slash"},
+        {"date": START + timedelta(minutes=5), "command": "ping", "guild_id": 1, "command_type": "slash"},
+    ]
+    analytics.apply_rollups(rows)
+    analytics.apply_rollups(rows[:1])
+
+    hourly = database.CommandUsageHourly.get(database.CommandUsageHourly.command == "ping")
+    assert hourly.uses == 3
+    assert database.CommandUsageDaily.select().count() == 1
+    assert analytics.top_commands(START - timedelta(days=3)) == [("ping", 3)]
+
+
+def test_quota_counter_upserts_add_up(migrated):
+    for _ in range(3):
+        event_quota.record_event(42, "Training", START)
+    event_quota.record_event(42, "Raid", START)
+
+    counts = dict(
+        database.EventQuotaCount.select(database.EventQuotaCount.event_type, database.EventQuotaCount.events).tuples()
+    )
+    assert counts == {"Training": 3, "Raid": 1}
+
+
+# -- event history --
+
+def test_recent_for_matches_names_and_discord_id(migrated):
+    _event("Host", 1, "Alice", 0, 0)
+    _event("Alice", 7, "Bob", 0, 1)  # hosted under her Discord ID
+    _event("Host", 1, "alice ", 0, 2)  # same alias, different spelling
+    _event("Host", 1, "Bob", 0, 3)
+    _event("Host", 1, "ALICE", 0, 4)
+
+    events, total = ELR.recent_for(["Alice"], discord_id=7, limit=3)
+
+    assert total == 4
+    assert [event.datetime_object for event in events] == [START + timedelta(minutes=m) for m in (4, 2, 1)]
+    assert ELR.recent_for(["nobody"]) == ([], 0)
+
+
+def test_history_page_walks_every_event_once(migrated):
+    for minute in range(23):
+        # every timestamp is shared by two rows, so the id tiebreak matters
+        _event("Host", 1, "Alice", 0, minute // 2)
+        _event("Host", 1, "Bob", 0, minute // 2)
+
+    seen, cursor = [], None
+    while True:
+        page = ELR.history_page(["alice"], cursor=cursor, limit=5)
+        if not page:
+            break
+        seen.extend(page)
+        cursor = (page[-1].datetime_object, page[-1].id)
+
+    assert len(seen) == 23
+    assert len({event.id for event in seen}) == 23
+    keys = [(event.datetime_object, event.id) for event in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    # and back: the page newer than the third page is the second one
+    first, second, third = seen[:5], seen[5:10], seen[10:15]
+    newer = ELR.history_page(["alice"], cursor=(third[0].datetime_object, third[0].id), older=False, limit=5)
+    assert [event.id for event in newer] == [event.id for event in second]
+    assert ELR.history_page(["alice"], cursor=(first[0].datetime_object, first[0].id), older=False) == []
+
+
+# -- export --
+
+def test_export_reads_every_row_once_in_chunks(migrated, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(export, "CHUNK_SIZE", 4)
+    for minute in range(10):
+        _event("Host", 1, f"Member{minute}", 0, minute)
+    _event("Other", 2, "Alice", 0, 11)
+
+    path, written = export.export_events("csv", host_id=1)
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert written == len(rows) == 10
+    assert [row["attendee_username"] for row in rows] == [f"Member{minute}" for minute in range(10)]
+
+    path, written = export.export_events("jsonl", since=START + timedelta(minutes=8))
+    with gzip.open(path, "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert written == 3
+    assert [row["host_username"] for row in rows] == ["Host", "Host", "Other"]
@@ -0,0 +1,106 @@
+"""
+Slash command timing against real discord.py interactions, with the webhook HTTP layer answered locally. Fails if a
+discord.py upgrade moves what `metrics._TimedInteraction` relies on.
+"""
+import asyncio
+
+import discord
+import pytest
+from discord.webhook import async_ as webhook_async
+
+from core import metrics
+
+CALLBACK = {"interaction": {"id": "1", "type": 2}}
+MESSAGE = {
+    "id": "9",
+    "channel_id": "4",
+    "author": {"id": "2", "username": "bot", "discriminator": "0", "avatar": None},
+    "content": "",
+    "timestamp": "2025-03-01T12:00:00+00:00",
+    "edited_timestamp": None,
+    "tts": False,
+    "mention_everyone": False,
+    "mentions": [],
+    "mention_roles": [],
+    "attachments": [],
+    "embeds": [],
+    "pinned": False,
+    "type": 0,
+}
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    sent = []
+
+    async def request(self, route, *args, **kwargs):
+        sent.append((route.method, route.path))
+        return CALLBACK if route.path.endswith("/callback") else MESSAGE
+
+    monkeypatch.setattr(webhook_async.AsyncWebhookAdapter, "request", request)
+    return sent
+
+
+def _run(scenario):
+    async def main():
+        client = discord.Client(intents=discord.Intents.none())
+        interaction = discord.Interaction(
+            data={
+                "id": "1",
+                "application_id": "2",
+                "type": 2,
+                "token": "token",
+                "version": 1,
+                "attachment_size_limit": 8 * 1024 * 1024,
+                "channel_id": "4",
+                "data": {"id": "3", "name": "ping", "type": 1},
+                "user": {"id": "5", "username": "member", "discriminator": "0", "avatar": None},
+            },
+            state=client._connection,
+        )
+        metrics.track_interaction(interaction)
+        try:
+            await scenario(interaction)
+        finally:
+            metrics.finish_interaction(interaction)
+            await client.close()
+
+    before = metrics.command_seconds.series()
+    asyncio.run(main())
+    after = metrics.command_seconds.series()
+    # commands outside the tree are named "unknown"
+    return {
+        stage: after.get(("unknown", stage), (0, 0))[0] - before.get(("unknown", stage), (0, 0))[0]
+        for stage in ("defer", "first_response", "total")
+    }
+
+
+def test_tracked_interactions_are_timed(requests):
+    async def scenario(interaction):
+        assert isinstance(interaction, metrics._TimedInteraction)
+        assert isinstance(interaction.response, metrics._TimedResponse)
+        assert isinstance(interaction.followup, metrics._TimedFollowup)
+
+    _run(scenario)
+
+
+def test_direct_response(requests):
+    async def scenario(interaction):
+        await interaction.response.send_message("pong")
+        await interaction.followup.send("and another")
+
+    assert _run(scenario) == {"defer": 0, "first_response": 1, "total": 1}
+
+
+@pytest.mark.parametrize("reply", ["followup", "edit"])
+def test_first_response_after_defer(requests, reply):
+    async def scenario(interaction):
+        await interaction.response.defer()
+        if reply == "followup":
+            await interaction.followup.send("done")
+        else:
+            await interaction.edit_original_response(content="done")
+        await interaction.followup.send("and another")
+
+    assert _run(scenario) == {"defer": 1, "first_response": 1, "total": 1}
+    assert len(requests) == 3
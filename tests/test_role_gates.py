@@ -0,0 +1,76 @@
+"""Role gates against real discord.py members, so a discord.py upgrade that changes how members keep roles shows up."""
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from core import role_gates
+
+GUILD_ID = 1
+BOT_MANAGER = 900
+
+
+def _role(role_id: int, name: str, position: int) -> dict:
+    return {
+        "id": str(role_id),
+        "name": name,
+        "color": 0,
+        "hoist": False,
+        "position": position,
+        "permissions": "0",
+        "managed": False,
+        "mentionable": False,
+    }
+
+
+@pytest.fixture
+def guild():
+    client = discord.Client(intents=discord.Intents.none())
+    roles = [
+        _role(GUILD_ID, "@everyone", 0),
+        _role(role_gates.OFFICER_CORPS, "Officer Corps", 1),
+        _role(BOT_MANAGER, "Bot Manager", 2),
+    ]
+    yield discord.Guild(data={"id": str(GUILD_ID), "name": "Arasaka", "roles": roles}, state=client._connection)
+    role_gates.forget_named_roles(GUILD_ID)
+
+
+def _member(guild: discord.Guild, member_id: int, *role_ids: int) -> discord.Member:
+    return discord.Member(
+        data={
+            "user": {"id": str(member_id), "username": f"member{member_id}", "discriminator": "0", "avatar": None},
+            "roles": [str(role_id) for role_id in role_ids],
+            "joined_at": "2025-03-01T12:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        },
+        guild=guild,
+        state=guild._state,
+    )
+
+
+def test_member_role_ids_match_the_public_roles(guild):
+    member = _member(guild, 10, role_gates.OFFICER_CORPS, BOT_MANAGER)
+
+    ids = role_gates.member_role_ids(member)
+
+    # the fast path: discord.py still keeps the raw ID list, so no Role objects were built
+    assert ids is getattr(member, "_roles", None)
+    assert set(ids) == {role.id for role in member.roles if not role.is_default()}
+
+
+def test_member_role_ids_fall_back_to_the_public_roles():
+    member = SimpleNamespace(roles=[SimpleNamespace(id=role_gates.HICOM), SimpleNamespace(id=BOT_MANAGER)])
+    assert role_gates.member_role_ids(member) == [role_gates.HICOM, BOT_MANAGER]
+
+
+def test_gates_by_id_and_by_name(guild):
+    officer = _member(guild, 10, role_gates.OFFICER_CORPS)
+    manager = _member(guild, 11, BOT_MANAGER)
+    nobody = _member(guild, 12)
+
+    assert role_gates.passes("officer_corps_plus", officer)
+    assert not role_gates.passes("officer_corps_plus", manager)
+    assert role_gates.passes("help_viewers", manager)
+    assert not role_gates.passes("help_viewers", nobody)
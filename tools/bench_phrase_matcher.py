@@ -0,0 +1,114 @@
+"""
+Benchmark for core/phrase_matcher.py against the naive per-message difflib scan it replaced.
+
+Builds a synthetic chat corpus (short chatter, long paragraphs, links, emoji, and event requests with typos),
+checks both implementations agree on every message, and prints throughput plus the matcher's filter counters.
+
+    python tools/bench_phrase_matcher.py --messages 20000 --seed 7
+"""
+import argparse
+import difflib
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.phrase_matcher import EVENT_REQUEST_PHRASES, PhraseMatcher  # noqa: E402
+
+CHATTER = [
+    "lol", "gg", "ok", "yeah", "no way", "brb", "what", "true", "lmao", "nice", "ty", "wsg", "same",
+    "who's on tonight", "did anyone see the update", "my game keeps crashing", "i'm so tired rn",
+    "that was a crazy match", "anyone wanna play", "good morning everyone", "what rank are you",
+    "how do i get promoted", "where do i submit my promotion request", "congrats on the rank up!",
+    "can someone help me with the spreadsheet", "i think the bot is down", "who pinged me",
+]
+WORDS = (
+    "the a to and of you i it is that in for on with this was are be have at not but just like so get "
+    "event events host training rally spar agent rank xp quota officer hicom group game server night "
+    "when why what anyone someone please pls plz today soon now next another more time"
+).split()
+EMOJI = ["😂", "💀", "🔥", "👍", "<:8410joshhutchersonwhistle:1189723626266693702>", "🙏"]
+
+
+def typo(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 2)):
+        if not chars:
+            break
+        i = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[i] = rng.choice(string.ascii_lowercase)
+        elif op < 0.7:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+    return "".join(chars)
+
+
+def build_corpus(size: int, seed: int) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.45:
+            message = rng.choice(CHATTER)
+        elif kind < 0.75:
+            message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 14)))
+        elif kind < 0.87:
+            message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 120)))
+        elif kind < 0.92:
+            message = f"https://www.roblox.com/games/{rng.randint(10 ** 9, 10 ** 10)} {rng.choice(EMOJI)}"
+        else:
+            message = typo(rng.choice(EVENT_REQUEST_PHRASES), rng)
+            if rng.random() < 0.3:
+                message = message.upper()
+        if rng.random() < 0.1:
+            message += " " + rng.choice(EMOJI)
+        corpus.append(message)
+    return corpus
+
+
+def naive(message: str, phrases, threshold: float = 0.6) -> bool:
+    message = message.lower()
+    for phrase in phrases:
+        if difflib.SequenceMatcher(None, message, phrase.lower()).ratio() >= threshold:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages, args.seed)
+    matcher = PhraseMatcher(EVENT_REQUEST_PHRASES, args.threshold)
+
+    started = time.perf_counter()
+    expected = [naive(message, EVENT_REQUEST_PHRASES, args.threshold) for message in corpus]
+    naive_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = [matcher.matches(message) for message in corpus]
+    matcher_s = time.perf_counter() - started
+
+    mismatches = [message for message, a, b in zip(corpus, expected, actual) if a != b]
+    print(f"messages:        {len(corpus)} ({sum(expected)} matches)")
+    print(f"naive difflib:   {naive_s * 1000:8.1f} ms  ({naive_s / len(corpus) * 1e6:7.1f} us/message)")
+    print(f"PhraseMatcher:   {matcher_s * 1000:8.1f} ms  ({matcher_s / len(corpus) * 1e6:7.1f} us/message)")
+    print(f"speedup:         {naive_s / matcher_s:8.1f}x")
+    print(f"filter counters: {dict(matcher.stats)}")
+    if mismatches:
+        print(f"MISMATCHES: {len(mismatches)}, e.g. {mismatches[:5]}")
+        sys.exit(1)
+    print("results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Local stand-in for the Blox.link and Roblox APIs used by the bot.
+
+Lets link resolution and rank changes be load tested without touching the real services or their rate limits.
+Start it and point the bot at it:
+
+    python tools/stand_in_server.py --port 8081 --latency-ms 80 --error-rate 0.02 --rate-limit 60
+
+    BLOXLINK_API_BASE_URL=http://127.0.0.1:8081
+    ROBLOX_API_BASE_URL=http://127.0.0.1:8081
+
+Roblox requests arrive as ``/<subdomain>/<path>`` (see ``core.common.StandInTransport``), Blox.link requests keep
+their normal path. ``GET /__stats`` returns request counters.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+
+GROUP_ID = 33764698
+ROLES = [
+    (255, "[CL] Clan Leader"),
+    (200, "[H-1] Board of Directors"),
+    (120, "[O-4] Chief Corporate Field Officer"),
+    (110, "[O-3] Senior Corporate Field Officer"),
+    (100, "[O-2] Corporate Field Officer"),
+    (90, "[O-1] Junior Corporate Field Officer"),
+    (80, "[COOT] Corporate Officer on Trial"),
+    (70, "[N-3] Commander"),
+    (60, "[N-2] Command Sergeant"),
+    (50, "[N-1] Sergeant"),
+    (40, "[A-5] Senior Agent"),
+    (30, "[A-4] Specialist"),
+    (20, "[A-3] Operative"),
+    (10, "[A-2] Junior Operative"),
+    (5, "[A-1] Initiate"),
+    (1, "Civilian"),
+]
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 25.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0
+    burst: int = 10
+    retry_after: int = 5
+    members: int = 500
+    unlinked_rate: float = 0.05
+    seed: int = 33764698
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class StandInState:
+    """Fake group roster plus the knobs that shape every response."""
+
+    def __init__(self, config: StandInConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.stats = Counter()
+        self.buckets = {
+            "bloxlink": TokenBucket(config.rate_limit / 60, config.burst),
+            "roblox": TokenBucket(config.rate_limit / 60, config.burst),
+        }
+
+        self.roles = {}
+        for index, (rank, name) in enumerate(ROLES):
+            role_id = 90000000 + index
+            self.roles[role_id] = {"id": role_id, "name": name, "rank": rank, "description": ""}
+
+        # most members sit in the low ranks, like the real group
+        weights = [1 if rank > 50 else 20 for rank, _ in ROLES]
+        role_ids = list(self.roles)
+        self.users = {}
+        self.member_role = {}
+        for index in range(config.members):
+            user_id = 1000000 + index
+            self.users[user_id] = {"id": user_id, "name": f"Agent{index:05d}", "displayName": f"Agent {index}"}
+            self.member_role[user_id] = self.random.choices(role_ids, weights)[0]
+        self.usernames = {user["name"].lower(): user_id for user_id, user in self.users.items()}
+
+    def roblox_id_for_discord(self, discord_id: int):
+        # every Discord ID deterministically maps onto a member unless it lands in the unlinked share
+        if (discord_id % 10000) / 10000 < self.config.unlinked_rate:
+            return None
+        user_ids = list(self.users)
+        return user_ids[discord_id % len(user_ids)]
+
+    def role_members(self, role_id: int):
+        return [user_id for user_id, member_role in self.member_role.items() if member_role == role_id]
+
+
+def _user_payload(user: dict) -> dict:
+    return {
+        "description": "",
+        "created": "2020-01-01T00:00:00.000Z",
+        "isBanned": False,
+        "externalAppDisplayName": None,
+        "hasVerifiedBadge": False,
+        "id": user["id"],
+        "name": user["name"],
+        "displayName": user["displayName"],
+    }
+
+
+def _role_payload(state: StandInState, role: dict) -> dict:
+    return {**role, "memberCount": len(state.role_members(role["id"]))}
+
+
+def _group_payload(state: StandInState) -> dict:
+    return {
+        "id": GROUP_ID,
+        "name": "Arasaka Stand-In",
+        "description": "",
+        "owner": None,
+        "shout": None,
+        "memberCount": len(state.users),
+        "isBuildersClubOnly": False,
+        "publicEntryAllowed": True,
+        "hasVerifiedBadge": False,
+    }
+
+
+@web.middleware
+async def shape_responses(request: web.Request, handler):
+    state: StandInState = request.app["state"]
+    config = state.config
+    service = "stats" if request.path.startswith("/__") else "bloxlink" if request.path.startswith("/v4/") else "roblox"
+    if service == "stats":
+        return await handler(request)
+
+    state.stats[f"{service}_requests"] += 1
+    await asyncio.sleep(max(0.0, config.latency_ms + state.random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+
+    if not state.buckets[service].take():
+        state.stats[f"{service}_429"] += 1
+        return web.json_response(
+            {"errors": [{"code": 0, "message": "Too many requests"}]},
+            status=429,
+            headers={"Retry-After": str(config.retry_after)},
+        )
+    if state.random.random() < config.error_rate:
+        state.stats[f"{service}_5xx"] += 1
+        return web.json_response({"errors": [{"code": 0, "message": "InternalServerError"}]}, status=503)
+
+    return await handler(request)
+
+
+routes = web.RouteTableDef()
+
+
+@routes.get("/__stats")
+async def stats(request: web.Request):
+    return web.json_response(dict(request.app["state"].stats))
+
+
+@routes.get("/v4/public/guilds/{guild_id}/discord-to-roblox/{discord_id}")
+async def discord_to_roblox(request: web.Request):
+    state: StandInState = request.app["state"]
+    roblox_id = state.roblox_id_for_discord(int(request.match_info["discord_id"]))
+    if roblox_id is None:
+        return web.json_response({"error": "User not found"}, status=404)
+    return web.json_response({"robloxID": str(roblox_id), "resolved": {}})
+
+
+@routes.get("/users/v1/users/{user_id}")
+async def get_user(request: web.Request):
+    state: StandInState = request.app["state"]
+    user = state.users.get(int(request.match_info["user_id"]))
+    if user is None:
+        return web.json_response({"errors": [{"code": 3, "message": "The user id is invalid."}]}, status=404)
+    return web.json_response(_user_payload(user))
+
+
+@routes.post("/users/v1/usernames/users")
+async def get_users_by_usernames(request: web.Request):
+    state: StandInState = request.app["state"]
+    body = await request.json()
+    data = []
+    for username in body.get("usernames", []):
+        user_id = state.usernames.get(username.lower())
+        if user_id is not None:
+            user = state.users[user_id]
+            data.append({"requestedUsername": username, "hasVerifiedBadge": False, **user})
+    return web.json_response({"data": data})
+
+
+@routes.get("/groups/v1/groups/{group_id}")
+async def get_group(request: web.Request):
+    return web.json_response(_group_payload(request.app["state"]))
+
+
+@routes.get("/groups/v1/groups/{group_id}/roles")
+async def get_roles(request: web.Request):
+    state: StandInState = request.app["state"]
+    return web.json_response({
+        "groupId": GROUP_ID,
+        "roles": [_role_payload(state, role) for role in state.roles.values()],
+    })
+
+
+@routes.get("/groups/v1/groups/{group_id}/roles/{role_id}/users")
+async def get_role_members(request: web.Request):
+    state: StandInState = request.app["state"]
+    limit = int(request.query.get("limit", 10))
+    offset = int(request.query.get("cursor") or 0)
+    members = state.role_members(int(request.match_info["role_id"]))
+    if request.query.get("sortOrder", "Asc") == "Desc":
+        members.reverse()
+    page = members[offset:offset + limit]
+    return web.json_response({
+        "previousPageCursor": str(max(0, offset - limit)) if offset else None,
+        "nextPageCursor": str(offset + limit) if offset + limit < len(members) else None,
+        "data": [
+            {"hasVerifiedBadge": False, "userId": user_id, "username": state.users[user_id]["name"],
+             "displayName": state.users[user_id]["displayName"]}
+            for user_id in page
+        ],
+    })
+
+
+@routes.get("/groups/v1/users/{user_id}/groups/roles")
+async def get_user_group_roles(request: web.Request):
+    state: StandInState = request.app["state"]
+    role_id = state.member_role.get(int(request.match_info["user_id"]))
+    if role_id is None:
+        return web.json_response({"data": []})
+    return web.json_response({
+        "data": [{"group": _group_payload(state), "role": _role_payload(state, state.roles[role_id])}]
+    })
+
+
+@routes.patch("/groups/v1/groups/{group_id}/users/{user_id}")
+async def set_role(request: web.Request):
+    state: StandInState = request.app["state"]
+    user_id = int(request.match_info["user_id"])
+    role_id = (await request.json()).get("roleId")
+    if user_id not in state.member_role or role_id not in state.roles:
+        return web.json_response({"errors": [{"code": 2, "message": "The roleset is invalid or does not exist."}]}, status=400)
+    state.member_role[user_id] = role_id
+    state.stats["rank_changes"] += 1
+    return web.json_response({})
+
+
+@routes.delete("/groups/v1/groups/{group_id}/users/{user_id}")
+async def kick_user(request: web.Request):
+    state: StandInState = request.app["state"]
+    state.member_role.pop(int(request.match_info["user_id"]), None)
+    state.stats["kicks"] += 1
+    return web.json_response({})
+
+
+def build_app(config: StandInConfig) -> web.Application:
+    app = web.Application(middlewares=[shape_responses])
+    app["state"] = StandInState(config)
+    app.add_routes(routes)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=StandInConfig.latency_ms, help="Mean added latency.")
+    parser.add_argument("--jitter-ms", type=float, default=StandInConfig.jitter_ms, help="Uniform +/- jitter.")
+    parser.add_argument("--error-rate", type=float, default=StandInConfig.error_rate,
+                        help="Share of requests answered with a 503 (0-1).")
+    parser.add_argument("--rate-limit", type=float, default=StandInConfig.rate_limit,
+                        help="Requests per minute per service before answering 429 (0 disables).")
+    parser.add_argument("--burst", type=int, default=StandInConfig.burst, help="Token bucket size for --rate-limit.")
+    parser.add_argument("--retry-after", type=int, default=StandInConfig.retry_after,
+                        help="Retry-After seconds sent with a 429.")
+    parser.add_argument("--members", type=int, default=StandInConfig.members, help="Size of the fake group.")
+    parser.add_argument("--unlinked-rate", type=float, default=StandInConfig.unlinked_rate,
+                        help="Share of Discord IDs that have no Blox.link link (0-1).")
+    parser.add_argument("--seed", type=int, default=StandInConfig.seed)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        retry_after=args.retry_after,
+        members=args.members,
+        unlinked_rate=args.unlinked_rate,
+        seed=args.seed,
+    )
+    web.run_app(build_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import time
+import typing
+from datetime import datetime, timedelta
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import analytics, database
+from core.checks import slash_is_bot_admin_2
+from core.common import LoggingChannels
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+PERIODS = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "90d": timedelta(days=90),
+}
+# buckets listed when showing a single command, the total covers the whole period
+SERIES_ROWS = 20
+
+
+class Analytics(commands.Cog):
+    """Command usage statistics, answered from the CommandAnalytics rollup tables."""
+
+    def __init__(self, bot: "ArasakaCorpBot"):
+        self.bot: "ArasakaCorpBot" = bot
+
+    @property
+    def display_emoji(self) -> str:
+        return "📊"
+
+    async def cog_load(self) -> None:
+        # first start with rollups: build them from whatever raw history already exists
+        needs_backfill = await database.run_sync(
+            lambda: not database.CommandUsageDaily.select().exists()
+            and database.CommandAnalytics.select().exists()
+        )
+        if needs_backfill:
+            rows = await database.run_sync(analytics.rebuild_rollups)
+            _log.info(f"Rolled up {rows} existing CommandAnalytics rows.")
+
+    @app_commands.command(name="analytics", description="Show which commands are used the most.")
+    @app_commands.guilds(LoggingChannels.guild)
+    @app_commands.describe(
+        period="How far back to look.",
+        command_type="Only count slash or prefix commands.",
+        command="Show the usage of one command over the period instead of the top list.",
+    )
+    @slash_is_bot_admin_2()
+    async def analytics(
+            self,
+            interaction: discord.Interaction,
+            period: typing.Literal["24h", "7d", "30d", "90d"] = "7d",
+            command_type: typing.Literal["slash", "regular"] = None,
+            command: str = None,
+    ):
+        started = time.perf_counter()
+        since = datetime.now() - PERIODS[period]
+
+        embed = discord.Embed(title="Command Analytics", color=discord.Color.blurple())
+        if command:
+            hourly = period == "24h"
+            series = await database.run_sync(
+                analytics.usage_series, command, since, hourly=hourly, command_type=command_type
+            )
+            total = sum(uses for _, uses in series)
+            bucket_format = "%-m/%-d %-I %p" if hourly else "%-m/%-d"
+            lines = [f"{bucket.strftime(bucket_format)}: {uses}" for bucket, uses in series[-SERIES_ROWS:]]
+            embed.description = (
+                f"Usage of `{command}`{' as a ' + command_type + ' command' if command_type else ''} "
+                f"over the last **{period}**: **{total}** uses."
+            )
+            embed.add_field(
+                name=f"Per {'Hour' if hourly else 'Day'} (newest {SERIES_ROWS})",
+                value="```\n" + ("\n".join(lines) or "No usage recorded.") + "\n```",
+                inline=False,
+            )
+        else:
+            top = await database.run_sync(analytics.top_commands, since, command_type)
+            embed.description = f"Most used {command_type + ' ' if command_type else ''}commands over the last **{period}**."
+            lines = [f"{index}. {name}: {uses}" for index, (name, uses) in enumerate(top, start=1)]
+            embed.add_field(
+                name="Top Commands",
+                value="```\n" + ("\n".join(lines) or "No usage recorded.") + "\n```",
+                inline=False,
+            )
+
+        embed.set_footer(text=f"Answered from rollups in {(time.perf_counter() - started) * 1000:.1f} ms")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Analytics(bot))
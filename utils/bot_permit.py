@@ -1,19 +1,25 @@
+import asyncio
 from pathlib import Path
+from typing import Dict, Optional
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from core import database
 from core.checks import (
+    permits,
     slash_is_bot_admin_4,
     slash_is_bot_admin,
 )
 from core.common import LoggingChannels
+from core.repository import repo
 
 load_dotenv()
 
+FETCH_CONCURRENCY = 5
+RESOLVE_BEFORE_DEFER = 1.5
+
 def get_extensions():
     extensions = ["jishaku"]
     for file in Path("utils").glob("**/*.py"):
@@ -27,6 +33,8 @@ class CoreBotConfig(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.__cog_name__ = "Core Bot Config"
         self.bot = bot
+        # users fetched from the API because they aren't in the bot's cache (e.g. no shared guild)
+        self._fetched_users: Dict[int, discord.User] = {}
 
     @property
     def display_emoji(self) -> str:
@@ -41,66 +49,24 @@ class CoreBotConfig(commands.Cog):
     @PM.command(description="Lists all permit levels and users.")
     @slash_is_bot_admin()
     async def list(self, interaction: discord.Interaction):
-        adminList = []
-
-        query1 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 1
-        )
-        for admin in query1:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
-
-        adminLEVEL1 = "\n".join(adminList)
-
-        adminList = []
-        query2 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 2
-        )
-        for admin in query2:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
-
-        adminLEVEL2 = "\n".join(adminList)
+        admins = await repo.administrators(min_tier=1)
 
-        adminList = []
-        query3 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 3
-        )
-        for admin in query3:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
+        # answer within the interaction deadline even if many users have to be fetched
+        resolving = asyncio.create_task(self._resolve_users([admin.discordID for admin in admins]))
+        done, _ = await asyncio.wait({resolving}, timeout=RESOLVE_BEFORE_DEFER)
+        deferred = not done
+        if deferred:
+            await interaction.response.defer()
+        users = await resolving
 
-        adminLEVEL3 = "\n".join(adminList)
-
-        adminList = []
-        query4 = database.Administrators.select().where(
-            database.Administrators.TierLevel == 4
-        )
-        for admin in query4:
-            user = self.bot.get_user(admin.discordID)
-            if user is None:
-                try:
-                    user = await self.bot.fetch_user(admin.discordID)
-                except:
-                    continue
-            adminList.append(f"`{user.name}` -> `{user.id}`")
+        adminLists = {tier: [] for tier in range(1, 5)}
+        for admin in admins:
+            user = users.get(admin.discordID)
+            if user is None or admin.TierLevel not in adminLists:
+                continue
+            adminLists[admin.TierLevel].append(f"`{user.name}` -> `{user.id}`")
 
-        adminLEVEL4 = "\n".join(adminList)
+        adminLEVEL1, adminLEVEL2, adminLEVEL3, adminLEVEL4 = ("\n".join(adminLists[tier]) for tier in range(1, 5))
 
         embed = discord.Embed(
             title="Bot Administrators",
@@ -119,7 +85,30 @@ class CoreBotConfig(commands.Cog):
             text="Only Owners/Permit 4's can modify Bot Administrators."
         )
 
-        await interaction.response.send_message(embed=embed)
+        if deferred:
+            await interaction.followup.send(embed=embed)
+        else:
+            await interaction.response.send_message(embed=embed)
+
+    async def _resolve_users(self, user_ids) -> Dict[int, discord.User]:
+        """Users for the given IDs from the bot's cache, fetching the rest concurrently (at most a few at a time)."""
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def resolve(user_id: int) -> Optional[discord.User]:
+            user = self.bot.get_user(user_id) or self._fetched_users.get(user_id)
+            if user is not None:
+                return user
+            async with semaphore:
+                try:
+                    user = await self.bot.fetch_user(user_id)
+                except discord.HTTPException:
+                    return None
+            self._fetched_users[user_id] = user
+            return user
+
+        user_ids = [*dict.fromkeys(user_ids)]
+        users = await asyncio.gather(*(resolve(user_id) for user_id in user_ids))
+        return {user_id: user for user_id, user in zip(user_ids, users) if user is not None}
 
     @PM.command(description="Remove a user from the Bot Administrators list.")
     @app_commands.describe(
@@ -127,16 +116,8 @@ class CoreBotConfig(commands.Cog):
     )
     @slash_is_bot_admin_4()
     async def remove(self, interaction: discord.Interaction, user: discord.User):
-        database.db.connect(reuse_if_open=True)
-
-        query = database.Administrators.select().where(
-            database.Administrators.discordID == user.id
-        )
-        if query.exists():
-            query = query.get()
-
-            query.delete_instance()
-
+        if await repo.remove_administrator(user.id):
+            await permits.refresh()
             embed = discord.Embed(
                 title="Successfully Removed User!",
                 description=f"{user.name} has been removed from the database!",
@@ -152,8 +133,6 @@ class CoreBotConfig(commands.Cog):
             )
             await interaction.response.send_message(embed=embed)
 
-        database.db.close()
-
     @PM.command(description="Add a user to the Bot Administrators list.")
     @app_commands.describe(
         user="The user to add to the Bot Administrators list.",
@@ -162,11 +141,8 @@ class CoreBotConfig(commands.Cog):
     async def add(
         self, interaction: discord.Interaction, user: discord.User, level: int
     ):
-        database.db.connect(reuse_if_open=True)
-        q: database.Administrators = database.Administrators.create(
-            discordID=user.id, TierLevel=level
-        )
-        q.save()
+        await repo.add_administrator(user.id, level)
+        await permits.refresh()
         embed = discord.Embed(
             title="Successfully Added User!",
             description=f"{user.name} has been added successfully with permit level `{str(level)}`.",
@@ -174,8 +150,6 @@ class CoreBotConfig(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
 
-        database.db.close()
-
 
 async def setup(bot):
     await bot.add_cog(CoreBotConfig(bot))
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+import typing
+from datetime import datetime
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import export, telemetry
+from core.checks import slash_is_bot_admin_3
+from core.common import LoggingChannels
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class EventExport(commands.Cog):
+    """Audit exports of EventLoggingRecords."""
+
+    def __init__(self, bot: "ArasakaCorpBot"):
+        self.bot: "ArasakaCorpBot" = bot
+
+    @property
+    def display_emoji(self) -> str:
+        return "📦"
+
+    @app_commands.command(name="export_events", description="Export event logging records as a compressed file.")
+    @app_commands.guilds(LoggingChannels.guild)
+    @app_commands.describe(
+        file_format="CSV for spreadsheets, JSONL for scripts.",
+        since="Only events on or after this date (YYYY-MM-DD).",
+        until="Only events before this date (YYYY-MM-DD).",
+        host="Only events hosted by this member.",
+        host_username="Only events hosted by this Roblox username.",
+    )
+    @slash_is_bot_admin_3()
+    async def export_events(
+            self,
+            interaction: discord.Interaction,
+            file_format: typing.Literal["csv", "jsonl"] = "csv",
+            since: str = None,
+            until: str = None,
+            host: discord.Member = None,
+            host_username: str = None,
+    ):
+        try:
+            since_date = datetime.strptime(since, "%Y-%m-%d") if since else None
+            until_date = datetime.strptime(until, "%Y-%m-%d") if until else None
+        except ValueError:
+            return await interaction.response.send_message(
+                "Dates must be in the format YYYY-MM-DD.", ephemeral=True
+            )
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        path, rows = await asyncio.to_thread(
+            export.export_events,
+            file_format,
+            since=since_date,
+            until=until_date,
+            host_id=host.id if host else None,
+            host_username=host_username,
+        )
+        telemetry.record_admin_action(
+            discord_id=interaction.user.id,
+            action="EXPORT_EVENTS",
+            content=f"{rows} rows, format={file_format}, since={since}, until={until}, "
+                    f"host={host.id if host else None}, host_username={host_username}",
+        )
+
+        limit = interaction.guild.filesize_limit if interaction.guild else 25 * 1024 * 1024
+        if path.stat().st_size > limit:
+            return await interaction.followup.send(
+                f"Exported **{rows}** events, but the file is too large to upload. It was saved on the host as "
+                f"`{path}`.",
+                ephemeral=True,
+            )
+        try:
+            await interaction.followup.send(
+                f"Exported **{rows}** events.", file=discord.File(path, filename=path.name), ephemeral=True
+            )
+        finally:
+            path.unlink(missing_ok=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(EventExport(bot))
@@ -10,15 +10,17 @@ from core.common import (
     process_xp_updates, RankHierarchy, LoggingChannels, SheetsClient, RobloxClient
 )
 from core.logging_module import get_log
-from core import event_quota
+from core.role_gates import role_gate
+from core.roster import roster
+from core import event_quota, role_gates
 
 _log = get_log(__name__)
 sheet = SheetsClient().sheet
-RClient = RobloxClient().client
 
 class EventLogging(commands.Cog):
-    def __init__(self, bot: "ArasakaCorpBot"):
+    def __init__(self, bot: "ArasakaCorpBot", roblox_client):
         self.bot: "ArasakaCorpBot" = bot
+        self.roblox = roblox_client
         self.group_id = 33764698
         self.interaction = []
 
@@ -36,6 +38,7 @@ class EventLogging(commands.Cog):
         ping_attendees="Ping attendees in the general chat saying their XP has been updated.",
         event_type="Identify the type of event for quota tracking.",
     )
+    @role_gate("officer_o2_plus")
     async def update(
             self,
             interaction: discord.Interaction,
@@ -44,21 +47,6 @@ class EventLogging(commands.Cog):
             event_type: typing.Literal["Spar", "Gamenight", "General Training", "Agent Rally", "Combat Training", "VBR GT", "Disciplinary Training"],
             ping_attendees: bool = True,
     ):
-        o_two = discord.utils.get(interaction.guild.roles, id=1143729159479234590)
-        o_three = discord.utils.get(interaction.guild.roles, id=1156342512500351036)
-        o_four = discord.utils.get(interaction.guild.roles, id=1143729281806127154)
-        high_command = discord.utils.get(interaction.guild.roles, id=1143736740075552860)
-        retired_hicom_role = discord.utils.get(interaction.guild.roles, id=1192942534968758342)
-
-        # Permission check
-        if not any(role in interaction.user.roles for role in
-                   [o_two, o_three, o_four, high_command, retired_hicom_role]) and interaction.user.id not in [
-            409152798609899530]:  # List of allowed user IDs can be expanded
-            return await interaction.response.send_message(
-                "You do not have permission to use this command.",
-                ephemeral=True,
-            )
-
         with start_transaction(op="command", name=f"cmd/{interaction.command.name}"):
             # Acknowledge the command invocation
             await interaction.response.defer(ephemeral=True, thinking=True)
@@ -118,17 +106,12 @@ class EventLogging(commands.Cog):
                 )
 
             xp_channel = await self.bot.fetch_channel(LoggingChannels.xp_log_ch)
-            officer_role = discord.utils.get(interaction.guild.roles, id=LoggingChannels.officer_role_id)
-            retired_hicom_role = discord.utils.get(interaction.guild.roles, id=1192942534968758342)
-
-            if not officer_role in interaction.user.roles and not retired_hicom_role in interaction.user.roles:
-                if interaction.user.id == 409152798609899530:
-                    pass
-                else:
-                    return await interaction.response.send_message(
-                        "You do not have permission to use this command.",
-                        ephemeral=True,
-                    )
+
+            if not role_gates.passes("officer_or_retired_hicom", interaction.user):
+                return await interaction.response.send_message(
+                    "You do not have permission to use this command.",
+                    ephemeral=True,
+                )
 
             cell = sheet.find(username, case_sensitive=False)
             await interaction.response.send_message(embed=embed)
@@ -164,6 +147,7 @@ class EventLogging(commands.Cog):
         name="set_rank",
         description="Manage the ranks of users in the Roblox Group."
     )
+    @role_gate("officer_o4_plus")
     async def rank_manage(
             self,
             interaction: discord.Interaction,
@@ -173,27 +157,18 @@ class EventLogging(commands.Cog):
             target_rank: str = None,
     ):
         with start_transaction(op="command", name=f"cmd/{interaction.command.name}"):
-            Officer_four = discord.utils.get(interaction.guild.roles, id=1143729281806127154)
-            HICOM = discord.utils.get(interaction.guild.roles, id=1143736740075552860)
-            BIGBOSS = discord.utils.get(interaction.guild.roles, id=1163157560237510696)
-            ClanLeader = discord.utils.get(interaction.guild.roles, id=1158472045248651434)
-            if not any(role in interaction.user.roles for role in
-                       [HICOM, BIGBOSS, ClanLeader, Officer_four]) and interaction.user.id not in [409152798609899530]:
-                return await interaction.response.send_message("You do not have permission to use this command.",
-                                                               ephemeral=True)
-
             if not roblox_usernames and not discord_username:
                 return await interaction.response.send_message("You must provide a target user.", ephemeral=True)
 
             await interaction.response.defer()
 
-            rank_obj = RankHierarchy(self.group_id, sheet)
+            rank_obj = RankHierarchy(self.group_id, sheet, client=self.roblox)
             await rank_obj.set_officer_rank(interaction.user)
 
-            group = await RClient.get_group(self.group_id)
+            group = await self.roblox.get_group(self.group_id)
 
             if discord_username:
-                r_user = rank_obj.discord_to_roblox(discord_username.id, group)
+                r_user = await rank_obj.discord_to_roblox(discord_username.id, group)
                 confirm_name = discord_username.display_name
                 roblox_usernames = [confirm_name]  # For uniform handling below
             else:
@@ -207,8 +182,13 @@ class EventLogging(commands.Cog):
                     confirm_name = roblox_username
 
                     if target_rank != "[KICK FROM GROUP] Remove/Exile User from Group":
-                        roles = await group.get_roles()
-                        await group.set_role(r_user.id, next((role.id for role in roles if role.name == target_rank), None))
+                        role = roster.role_by_name(target_rank)
+                        if role is not None:
+                            role_id = role.id
+                        else:
+                            roles = await group.get_roles()
+                            role_id = next((role.id for role in roles if role.name == target_rank), None)
+                        await group.set_role(r_user.id, role_id)
 
                         confirmation_embed = discord.Embed(
                             title="Rank Change",
@@ -283,6 +263,14 @@ class EventLogging(commands.Cog):
             "[KICK FROM GROUP] Remove/Exile User from Group",
         ]
 
+
+        # Only offer ranks below the officer when their rank is already known locally
+        officer_id = roster.roblox_id_for_discord(interaction.user.id)
+        assignable = roster.assignable_roles(officer_id) if officer_id is not None else None
+        if assignable is not None:
+            allowed = {role.name for role in assignable}
+            raw_ranks = [rank for rank in raw_ranks if rank in allowed or rank.startswith("[KICK FROM GROUP]")]
+
         return [
             app_commands.Choice(name=rank, value=rank)
             for rank in raw_ranks if current.lower() in rank.lower()
@@ -293,27 +281,13 @@ class EventLogging(commands.Cog):
         channel_id="The channel ID where the embed should be displayed (default: from env var).",
         message_id="The message ID to update (default: from env var or create new).",
     )
+    @role_gate("officer_o2_plus")
     async def update_quota_embed(
             self,
             interaction: discord.Interaction,
             channel_id: str = None,
             message_id: str = None,
     ):
-        # Permission check
-        o_two = discord.utils.get(interaction.guild.roles, id=1143729159479234590)
-        o_three = discord.utils.get(interaction.guild.roles, id=1156342512500351036)
-        o_four = discord.utils.get(interaction.guild.roles, id=1143729281806127154)
-        high_command = discord.utils.get(interaction.guild.roles, id=1143736740075552860)
-        retired_hicom_role = discord.utils.get(interaction.guild.roles, id=1192942534968758342)
-
-        if not any(role in interaction.user.roles for role in
-                   [o_two, o_three, o_four, high_command, retired_hicom_role]) and interaction.user.id not in [
-            409152798609899530]:
-            return await interaction.response.send_message(
-                "You do not have permission to use this command.",
-                ephemeral=True,
-            )
-
         await interaction.response.defer(ephemeral=True, thinking=True)
 
         try:
@@ -343,4 +317,4 @@ class EventLogging(commands.Cog):
 
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(EventLogging(bot))
+    await bot.add_cog(EventLogging(bot, RobloxClient.shared().client))
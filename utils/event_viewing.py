@@ -5,18 +5,94 @@ from discord import app_commands
 from discord.ext import commands
 from sentry_sdk import start_transaction
 
-from core import database
 from core.common import (
-    ArasakaRanks, SheetsClient
+    ArasakaRanks, SheetsClient, RobloxClient
 )
 from core.logging_module import get_log
+from core.repository import repo
 
 _log = get_log(__name__)
 sheet = SheetsClient().sheet
 
+HISTORY_PAGE_SIZE = 10
+
+
+def _format_event(event) -> str:
+    raw = event.datetime_object
+    dt = datetime.fromisoformat(raw) if isinstance(raw, str) else raw
+    date_str = dt.strftime("%-m/%-d/%Y %-I:%M %p EST")
+    return f"+ {event.xp_awarded} XP from {event.event_type} at {date_str} ({event.host_username})"
+
+
+class EventHistoryView(discord.ui.View):
+    """
+    Pages through a member's EventLoggingRecords with Next/Prev buttons.
+
+    Pages are fetched on demand with keyset pagination: the view only remembers the (datetime_object, id) of the
+    first and last event on screen, so going back a hundred pages is as cheap as the first one.
+    """
+
+    def __init__(self, author_id: int, title: str, names, discord_id: int = None):
+        super().__init__(timeout=300)
+        self.author_id = author_id
+        self.title = title
+        self.names = names
+        self.discord_id = discord_id
+        self.page_number = 0
+        self.events = []
+        self.has_older = False
+
+    async def load(self, cursor=None, older: bool = True):
+        """Fetch the page after (older) or before (newer) ``cursor``, one extra row tells if there is more."""
+        page = await repo.event_history(
+            self.names, self.discord_id, cursor=cursor, older=older, limit=HISTORY_PAGE_SIZE + 1
+        )
+        if older:
+            self.has_older = len(page) > HISTORY_PAGE_SIZE
+            self.events = page[:HISTORY_PAGE_SIZE]
+        else:
+            self.has_older = True
+            self.events = page[-HISTORY_PAGE_SIZE:]
+        self.previous_page.disabled = self.page_number == 0
+        self.next_page.disabled = not self.has_older
+
+    def embed(self) -> discord.Embed:
+        embed = discord.Embed(title=self.title, color=discord.Color.blue())
+        if self.events:
+            joined = "\n".join(_format_event(event) for event in self.events)
+            embed.description = f"```diff\n{joined}\n```"
+        else:
+            embed.description = "No events found."
+        embed.set_footer(text=f"Page {self.page_number + 1}")
+        return embed
+
+    @staticmethod
+    def _key(event):
+        return event.datetime_object, event.id
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("This isn't your event history.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Prev", style=discord.ButtonStyle.grey, emoji="⬅️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_number -= 1
+        await self.load(self._key(self.events[0]), older=False)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.grey, emoji="➡️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_number += 1
+        await self.load(self._key(self.events[-1]), older=True)
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+
 class EventViewing(commands.Cog):
-    def __init__(self, bot: "ArasakaCorpBot"):
+    def __init__(self, bot: "ArasakaCorpBot", roblox_client):
         self.bot: "ArasakaCorpBot" = bot
+        self.roblox = roblox_client
         self.group_id = 33764698
         self.interaction = []
 
@@ -53,7 +129,7 @@ class EventViewing(commands.Cog):
 
             # Create a RobloxDiscordLinker instance
             from core.common import RobloxDiscordLinker
-            linker = RobloxDiscordLinker(self.bot, interaction.guild_id, sheet)
+            linker = RobloxDiscordLinker(self.bot, interaction.guild_id, sheet, self.roblox)
 
             # Determine the target user
             if roblox_username:
@@ -211,49 +287,20 @@ class EventViewing(commands.Cog):
                           "https://discord.com/channels/1143709921326682182/1225898217833496697/1226349662752211004",
                     inline=False)
 
-            # Build base filter using both display_name and target_name
-            base_filter = (
-                    (database.EventLoggingRecords.host_username == display_name) |
-                    (database.EventLoggingRecords.attendee_username == display_name)
-            )
-
-            # If target_name is different from display_name, include it in the filter
-            if target_name != display_name:
-                base_filter |= (
-                    (database.EventLoggingRecords.host_username == target_name) |
-                    (database.EventLoggingRecords.attendee_username == target_name)
-                )
+            # Match both display_name and target_name
+            names = [display_name, target_name]
 
-            # Include Discord ID in the filter if available
+            # Include Discord ID in the lookup if available
             discord_id = None
             if isinstance(target_user, (discord.Member, discord.User)):
                 discord_id = target_user.id
             elif not target_user and not roblox_username:
                 discord_id = interaction.user.id
 
-            if discord_id:
-                base_filter |= (
-                    (database.EventLoggingRecords.attendee_id == discord_id) |
-                    (database.EventLoggingRecords.host_id == discord_id)
-                )
-
-            # 2) Query distinct rows and get total count
-            base_query = (
-                database.EventLoggingRecords
-                .select()
-                .where(base_filter)
-                .distinct()
-            )
-            total_count = base_query.count()
-
-            # 3) Grab the latest three
-            recent_events = (
-                base_query
-                .order_by(database.EventLoggingRecords.datetime_object.desc())
-                .limit(3)
-            )
+            # Latest three events and the total count, in one indexed query
+            recent_events, total_count = await repo.recent_events(names, discord_id, limit=3)
 
-            if recent_events.count() > 0:
+            if len(recent_events) > 0:
                 event_list = []
                 for event in recent_events:
                     # parse string→datetime if necessary
@@ -302,6 +349,50 @@ class EventViewing(commands.Cog):
             # Send the embed as the interaction response
             await interaction.followup.send(embed=embed, ephemeral=False)
 
+    @XP.command(
+        name="history",
+        description="Browse every event you or another user hosted or attended."
+    )
+    @app_commands.describe(
+        target_user="The user whose events you want to view. Leave empty to view your own.",
+        roblox_username="If the user has not linked/updated their Discord username to be their Roblox username, you can manually provide their Roblox username here."
+    )
+    async def history(
+            self,
+            interaction: discord.Interaction,
+            target_user: discord.Member = None,
+            roblox_username: str = None,
+    ):
+        with start_transaction(op="command", name=f"cmd/{interaction.command.name}"):
+            if target_user and roblox_username:
+                confirmation_embed = discord.Embed(
+                    color=discord.Color.brand_red(),
+                    title="Too Many Arguments!",
+                    description=f"Hey {interaction.user.mention}, you provided both a discord user and a roblox username. "
+                                f"Please provide only one!"
+                )
+                return await interaction.response.send_message(embed=confirmation_embed, ephemeral=True)
+            await interaction.response.defer(thinking=True)
+
+            from core.common import RobloxDiscordLinker
+            linker = RobloxDiscordLinker(self.bot, interaction.guild_id, sheet, self.roblox)
+
+            # same identities /xp_view view matches its recent events on
+            if roblox_username:
+                names = [roblox_username]
+                discord_id = None
+                display_name = roblox_username
+            else:
+                member = target_user or interaction.user
+                roblox_name = await linker.discord_id_to_roblox_username(member.id)
+                names = [member.display_name, roblox_name or member.display_name]
+                discord_id = member.id
+                display_name = member.display_name
+
+            view = EventHistoryView(interaction.user.id, f"{display_name}'s Event History", names, discord_id)
+            await view.load()
+            await interaction.followup.send(embed=view.embed(), view=view)
+
     @XP.command(
         name="link",
         description="Information about linking your Discord account with your Roblox account."
@@ -387,4 +478,4 @@ class EventViewing(commands.Cog):
 
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(EventViewing(bot))
+    await bot.add_cog(EventViewing(bot, RobloxClient.shared().client))
@@ -0,0 +1,117 @@
+import typing
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from core import metrics
+from core.checks import slash_is_bot_admin_2
+from core.common import LoggingChannels
+from core.watchdog import loop_lag_seconds, watchdog
+
+
+def _ms(seconds: typing.Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+class Latency(commands.Cog):
+    """Summaries of the in-process metrics also served at the metrics endpoint, and of the event loop watchdog."""
+
+    def __init__(self, bot: "ArasakaCorpBot"):
+        self.bot: "ArasakaCorpBot" = bot
+
+    @property
+    def display_emoji(self) -> str:
+        return "⏱️"
+
+    @app_commands.command(name="command_latency", description="Show slash command latency percentiles since startup.")
+    @app_commands.guilds(LoggingChannels.guild)
+    @app_commands.describe(
+        command="Show the stages of one command (e.g. 'xp_manage update') instead of the busiest commands.",
+    )
+    @slash_is_bot_admin_2()
+    async def command_latency(self, interaction: discord.Interaction, command: str = None):
+        histogram = metrics.command_seconds
+        totals = {
+            name: count for (name, stage), (count, _) in histogram.series().items() if stage == "total"
+        }
+
+        embed = discord.Embed(title="Command Latency", color=discord.Color.blurple())
+        if command:
+            lines = [f"{'stage':<15}{'n':>6}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for stage in ("defer", "first_response", "total"):
+                count = histogram.series().get((command, stage), (0, 0))[0]
+                lines.append(
+                    f"{stage:<15}{count:>6}"
+                    + "".join(f"{_ms(histogram.quantile(q, command=command, stage=stage)):>7}" for q in (0.5, 0.95, 0.99))
+                )
+            errors = metrics.commands_total.value(command=command, outcome="error")
+            blocked = metrics.commands_total.value(command=command, outcome="blocked")
+            embed.description = (
+                f"`{command}` since startup, in ms. Errors: **{errors:.0f}**, blocked: **{blocked:.0f}**.\n"
+                "```\n" + "\n".join(lines) + "\n```"
+            )
+        else:
+            busiest = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:15]
+            lines = [f"{'command':<24}{'n':>6}{'p50':>7}{'p95':>7}{'p99':>7}{'err':>5}"]
+            for name, count in busiest:
+                errors = metrics.commands_total.value(command=name, outcome="error")
+                lines.append(
+                    f"{name[:23]:<24}{count:>6}"
+                    + "".join(f"{_ms(histogram.quantile(q, command=name, stage='total')):>7}" for q in (0.5, 0.95, 0.99))
+                    + f"{errors:>5.0f}"
+                )
+            embed.description = (
+                "Total time of the busiest commands since startup, in ms.\n"
+                "```\n" + ("\n".join(lines) if busiest else "No commands recorded yet.") + "\n```"
+            )
+
+        external = []
+        for (service,), (count, total_seconds) in sorted(metrics.external_seconds.series().items()):
+            failed = sum(
+                value for (name, outcome), value in metrics.external_calls.values.items()
+                if name == service and outcome in ("error", "429", "5xx")
+            )
+            p95 = _ms(metrics.external_seconds.quantile(0.95, service=service))
+            external.append(f"{service}: {count} calls, p95 {p95} ms, {failed:.0f} failed")
+        embed.add_field(
+            name="External Calls",
+            value="```\n" + ("\n".join(external) or "None recorded.") + "\n```",
+            inline=False,
+        )
+        if metrics.server.port:
+            embed.set_footer(text=f"Full metrics: http://{metrics.server.host}:{metrics.server.port}/metrics")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="lag_report", description="Show recent event loop stalls and what was blocking.")
+    @app_commands.guilds(LoggingChannels.guild)
+    @slash_is_bot_admin_2()
+    async def lag_report(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="Event Loop Lag", color=discord.Color.blurple())
+        embed.description = (
+            f"Last heartbeat: **{_ms(watchdog.last_lag)} ms** late, p99 since startup: "
+            f"**{_ms(loop_lag_seconds.quantile(0.99))} ms**.\n"
+            f"Stalls over {watchdog.threshold * 1000:.0f} ms since startup: **{watchdog.stall_count}**."
+        )
+
+        recent = watchdog.recent(5)
+        lines = [
+            f"{discord.utils.format_dt(stall.started, style='R')} **{stall.seconds:.2f}s** `{stall.culprit}`\n"
+            f"↳ `{stall.where}`"
+            for stall in recent
+        ]
+        embed.add_field(name="Recent Stalls", value="\n".join(lines) or "None.", inline=False)
+
+        worst = watchdog.worst
+        if worst is not None and worst.stack:
+            stack = "\n".join(worst.stack)[-950:]
+            embed.add_field(
+                name=f"Worst: {worst.seconds:.2f}s in {worst.culprit}"[:256],
+                value=f"```\n{stack}\n```",
+                inline=False,
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Latency(bot))
@@ -1,15 +1,14 @@
 import sys
 import time
-import pytz
-from datetime import timedelta, datetime
+from datetime import timedelta
 
 import discord
 import psutil
 from discord import app_commands
 from discord.ext import commands
 
-from core import database
-from core.checks import is_botAdmin4, slash_is_bot_admin_3, slash_is_bot_admin_4
+from core import metrics, role_gates, telemetry
+from core.checks import is_botAdmin4, maintenance, slash_is_bot_admin_3, slash_is_bot_admin_4
 from core.logging_module import get_log
 from core.common import LoggingChannels, OpenAIClient
 
@@ -46,7 +45,8 @@ class MiscCMD(commands.Cog):
 
         pingembed.add_field(
             name="System Resource Usage",
-            value=f"```diff\n- CPU Usage: {psutil.cpu_percent()}%\n- Memory Usage: {psutil.virtual_memory().percent}%\n```",
+            value=f"```diff\n- CPU Usage: {psutil.cpu_percent()}%\n- Memory Usage: {psutil.virtual_memory().percent}%"
+                  f"\n- Telemetry Queue: {telemetry.writer.depth} pending (peak {telemetry.writer.high_water})\n```",
             inline=False,
         )
         pingembed.set_footer(
@@ -60,20 +60,18 @@ class MiscCMD(commands.Cog):
     @app_commands.guilds(LoggingChannels.guild)
     @slash_is_bot_admin_3()
     async def say(self, interaction: discord.Interaction, message: str):
-        NE = database.AdminLogging.create(
-            discordID=interaction.user.id, action="SAY", content=message
+        telemetry.record_admin_action(
+            discord_id=interaction.user.id, action="SAY", content=message
         )
-        NE.save()
         await interaction.response.send_message("Sent!", ephemeral=True)
         await interaction.channel.send(message)
 
     @commands.command()
     @is_botAdmin4
     async def t_say(self, ctx: commands.Context, *, message: str):
-        NE = database.AdminLogging.create(
-            discordID=ctx.author.id, action="t_say", content=message
+        telemetry.record_admin_action(
+            discord_id=ctx.author.id, action="t_say", content=message
         )
-        NE.save()
         await ctx.message.delete()
         await ctx.send(message)
 
@@ -81,10 +79,9 @@ class MiscCMD(commands.Cog):
     @app_commands.guilds(LoggingChannels.guild)
     @slash_is_bot_admin_3()
     async def dm(self, interaction: discord.Interaction, user: discord.Member, message: str):
-        NE = database.AdminLogging.create(
-            discordID=interaction.user.id, action="DM", content=message
+        telemetry.record_admin_action(
+            discord_id=interaction.user.id, action="DM", content=message
         )
-        NE.save()
         try:
             await user.send(message)
         except discord.Forbidden:
@@ -106,15 +103,8 @@ class MiscCMD(commands.Cog):
 
     @app_commands.command(name="help", description="List of commands available for ArasakaCorpBot.")
     async def help(self, interaction: discord.Interaction):
-        BM = discord.utils.get(interaction.guild.roles, name="Bot Manager")
-        OC = discord.utils.get(interaction.guild.roles, id=1143736564002861146)
-        HC = discord.utils.get(interaction.guild.roles, id=1143736740075552860)
-        CH = discord.utils.get(interaction.guild.roles, id=1158472045248651434)
-        BB = discord.utils.get(interaction.guild.roles, id=1163157560237510696)
-        IC = discord.utils.get(interaction.guild.roles, id=1176645976723816579)
-
         # check if any of the roles are in the user first.
-        if BM in interaction.user.roles or OC in interaction.user.roles or HC in interaction.user.roles or CH in interaction.user.roles or BB in interaction.user.roles or IC in interaction.user.roles:
+        if role_gates.passes("help_viewers", interaction.user):
             embed = discord.Embed(
                 title="Help",
                 color=discord.Colour.gold(),
@@ -147,39 +137,30 @@ class MiscCMD(commands.Cog):
     async def ask(interaction: discord.Interaction, *, question: str):
         """if interaction.channel_id != 1216431006031282286:
             return await interaction.response.send_message("lil bro, you can't use this command here. take your ass to <#1216431006031282286>")"""
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo-0125",
-            messages=[
-                {"role": "system",
-                 "content": "respond passive aggressively"},
-                {"role": "user", "content": question}
-            ]
-        )
+        with metrics.external_call("openai"):
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo-0125",
+                messages=[
+                    {"role": "system",
+                     "content": "respond passive aggressively"},
+                    {"role": "user", "content": question}
+                ]
+            )
         await interaction.response.send_message(response.choices[0].message.content)
 
     @app_commands.command(name="maintenance", description="Toggle maintenance mode")
     @app_commands.guilds(LoggingChannels.guild)
     @slash_is_bot_admin_4()
     async def maintenance(self, interaction: discord.Interaction, reason: str):
-        # Get the current maintenance status
-        query: database.MaintenanceMode = database.MaintenanceMode.select().where(database.MaintenanceMode.id == 1)
-        if not query.exists():
-            query = database.MaintenanceMode.create(enabled=False, reason="No reason provided.")
-
-        query = query.get()
         # Toggle the maintenance mode
-        query.enabled = not query.enabled
-        query.reason = reason
-        query.start_time = datetime.now(tz=pytz.timezone("America/New_York"))
-        query.save()
+        query = await maintenance.toggle(reason)
 
         # Log the action
-        NE = database.AdminLogging.create(
-            discordID=interaction.user.id, 
+        telemetry.record_admin_action(
+            discord_id=interaction.user.id, 
             action="MAINTENANCE", 
             content=f"Maintenance mode {'enabled' if query.enabled else 'disabled'}"
         )
-        NE.save()
 
         # Send a response
         await interaction.response.send_message(
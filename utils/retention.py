@@ -0,0 +1,40 @@
+import asyncio
+
+from discord.ext import commands, tasks
+
+from core import retention
+from core.logging_module import get_log
+
+_log = get_log(__name__)
+
+
+class Retention(commands.Cog):
+    """Archives and prunes old CommandAnalytics/AdminLogging rows once a day."""
+
+    def __init__(self, bot: "ArasakaCorpBot"):
+        self.bot: "ArasakaCorpBot" = bot
+
+    async def cog_load(self) -> None:
+        self.prune.start()
+
+    async def cog_unload(self) -> None:
+        self.prune.cancel()
+
+    @tasks.loop(hours=24)
+    async def prune(self):
+        try:
+            results = await asyncio.to_thread(retention.run)
+        except Exception as e:
+            _log.error(f"Retention run failed: {e}")
+            return
+        for table, archived in results.items():
+            if archived:
+                _log.info(f"Archived {archived} row(s) from {table} to {retention.ARCHIVE_DIR}.")
+
+    @prune.before_loop
+    async def before_prune(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Retention(bot))
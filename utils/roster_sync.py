@@ -0,0 +1,46 @@
+import os
+
+from discord.ext import commands, tasks
+
+from core.common import RobloxClient
+from core.logging_module import get_log
+from core.roster import roster
+
+_log = get_log(__name__)
+
+
+class RosterSync(commands.Cog):
+    """
+    Keeps the local Roblox group roster index in sync.
+
+    The first pass pages every role, later passes only re-page roles whose member count changed.
+    """
+
+    def __init__(self, bot: "ArasakaCorpBot", roblox_client):
+        self.bot: "ArasakaCorpBot" = bot
+        self.roblox = roblox_client
+        self.sync_roster.change_interval(minutes=float(os.getenv("ROSTER_SYNC_MINUTES", "5")))
+
+    async def cog_load(self) -> None:
+        self.sync_roster.start()
+
+    async def cog_unload(self) -> None:
+        self.sync_roster.cancel()
+
+    @tasks.loop(minutes=5)
+    async def sync_roster(self):
+        try:
+            repaged = await roster.refresh(self.roblox)
+        except Exception as e:
+            _log.error(f"Roster sync failed: {e}")
+            return
+        if repaged:
+            _log.info(f"Roster sync re-paged {repaged} role(s), {len(roster)} members indexed.")
+
+    @sync_roster.before_loop
+    async def before_sync_roster(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RosterSync(bot, RobloxClient.shared().client))